@@ -1,11 +1,19 @@
 import os
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file, session
+import time
+import uuid
+import hashlib
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
 from dotenv import load_dotenv
 import io
+from tempfile import SpooledTemporaryFile, gettempdir
+import numpy as np
 import pandas as pd
+import xlsxwriter
+from openpyxl import load_workbook
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
@@ -20,6 +28,8 @@ from database import (
     get_statistics,
     get_plakalar_by_type,
     hesapla_gercek_km,
+    hesapla_gercek_km_bulk,
+    get_performans_ozeti,
     fetch_all_paginated,
     get_aktif_kargo_araclari,
     get_aktif_binek_araclar,
@@ -37,6 +47,38 @@ from database import (
     record_processed_file
 )
 
+# AI modülleri ağırdır (sklearn, ollama); import maliyeti istek yerine
+# açılışta ödensin. Ortamda yoksa ilgili rotalar hata JSON'u döndürür.
+try:
+    from model_analyzer import analyze_from_database
+except ImportError as e:
+    print(f"model_analyzer yüklenemedi: {e}")
+    analyze_from_database = None
+
+try:
+    from ai_model import predict_fuel_consumption, detect_anomalies, bulk_predict_all_vehicles
+except ImportError as e:
+    print(f"ai_model yüklenemedi: {e}")
+    predict_fuel_consumption = None
+    detect_anomalies = None
+    bulk_predict_all_vehicles = None
+
+try:
+    from ollama_assistant import get_assistant_response
+except ImportError as e:
+    print(f"ollama_assistant yüklenemedi: {e}")
+    get_assistant_response = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
 load_dotenv()
 
 app = Flask(__name__)
@@ -46,13 +88,98 @@ app.secret_key = os.environ.get('SECRET_KEY', 'your-secret-key-here-change-in-pr
 # Jinja2 template'lere Python built-in fonksiyonları ekle
 app.jinja_env.globals.update(zip=zip)
 
+# Büyük JSON/HTML yanıtlarını sıkıştır - tel üzerindeki baytlar CPU
+# maliyetinden çok daha pahalı
+if Compress is not None:
+    app.config['COMPRESS_MIMETYPES'] = ['application/json', 'text/html',
+                                        'text/css', 'application/javascript']
+    app.config['COMPRESS_LEVEL'] = 5
+    app.config['COMPRESS_MIN_SIZE'] = 500
+    Compress(app)
+
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
+# PDF stilleri sabittir - her istekte yeniden kurmak yerine bir kez oluştur
+_PDF_STYLES = getSampleStyleSheet()
+_PDF_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_PDF_STYLES['Heading1'],
+    fontSize=16,
+    textColor=colors.HexColor('#2c3e50'),
+    spaceAfter=30,
+    alignment=1
+)
+_OZET_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+_EXPORT_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_PDF_STYLES['Heading1'],
+    fontSize=18,
+    textColor=colors.HexColor('#2C3E50'),
+    spaceAfter=20
+)
+_EXPORT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4CAF50')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
+])
+_PLAKA_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+# Sabit metinli Paragraph'lar da bir kez ayrıştırılsın; her PDF çağrısında
+# markup parse etmeye gerek yok (wrap aynı sayfa genişliğinde aynı sonucu verir)
+_EXPORT_TITLE_PARA = Paragraph('Yakıt Analiz Raporu', _EXPORT_TITLE_STYLE)
+_MUHASEBE_TITLE_PARA = Paragraph('MUHASEBE RAPORU', _PDF_TITLE_STYLE)
+_PLAKA_DETAY_PARA = Paragraph('Plaka Bazlı Detay', _PDF_STYLES['Heading2'])
+
+def ojsonify(obj):
+    """Büyük yanıtları orjson ile serileştir (yoksa jsonify'a düş)
+
+    orjson büyük iç içe dict'lerde birkaç kat hızlıdır ve NumPy
+    skalerlerini doğrudan destekler.
+    """
+    if orjson is None:
+        return jsonify(obj)
+    return Response(orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY),
+                    mimetype='application/json')
+
+def ojson_govde():
+    """İstek gövdesini orjson ile çöz (yoksa request.get_json'a düş)
+
+    Export uçlarına büyük arac_detaylari dizileri POST edilir; orjson
+    çözümlemesi stdlib json'dan birkaç kat hızlıdır.
+    """
+    if orjson is None:
+        return request.get_json()
+    return orjson.loads(request.get_data())
+
+# Health check birkaç saniyede bir çağrılıyor; Response nesnesini her istekte
+# yeniden kurmak yerine sabit yanıtı paylaş
+_HEALTH_OK = Response(b'{"status":"ok"}', mimetype='application/json')
+
 @app.route('/health')
 def health():
     """Railway health check endpoint"""
-    return jsonify({'status': 'ok', 'timestamp': datetime.now().isoformat()}), 200
+    return _HEALTH_OK
 
 @app.route('/')
 def index():
@@ -66,13 +193,26 @@ def muhasebe():
     """Muhasebe sayfası"""
     return render_template('muhasebe.html')
 
+def _onbellekli_yanit(response, max_age=60):
+    """GET yanıtına Cache-Control + ETag ekle, eşleşirse 304 döndür
+
+    Nadiren değişen referans verileri (plaka/araç listeleri) için tarayıcı
+    önbelleği kullanılır; isabet durumunda Supabase'e hiç gidilmez.
+    """
+    etag = hashlib.md5(response.get_data()).hexdigest()
+    if request.headers.get('If-None-Match') == etag:
+        return '', 304
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = f'public, max-age={max_age}'
+    return response
+
 @app.route('/api/plakalar')
 def api_plakalar():
     """Plaka listesi API - araç tipine göre filtrelenebilir"""
     try:
         arac_tipi = request.args.get('tip')
         plakalar = get_plakalar_by_type(arac_tipi)
-        return jsonify({'plakalar': plakalar})
+        return _onbellekli_yanit(jsonify({'plakalar': plakalar}))
     except Exception as e:
         return jsonify({'plakalar': [], 'error': str(e)})
 
@@ -80,7 +220,6 @@ def api_plakalar():
 def analyze():
     """Veritabanından analiz yap"""
     try:
-        from model_analyzer import analyze_from_database
         db_info = get_database_info()
         if not db_info.get('exists'):
             flash('❌ Veritabanı bağlantısı kurulamadı!', 'error')
@@ -92,11 +231,9 @@ def analyze():
         plaka = request.form.get('plaka') or None
         dahil_taseron = request.form.get('dahil_taseron') == '1'
 
-        # Filtreleri kaydet
-        session['filter_baslangic'] = baslangic_tarihi
-        session['filter_bitis'] = bitis_tarihi
-        session['filter_plaka'] = plaka
-        session['dahil_taseron'] = dahil_taseron
+        # Filtreler template'e 'filters' ile gidiyor; session'a yazmak hem
+        # her yanıtta çerez imzalatıyordu hem de yanıtı önbelleklenemez
+        # yapıyordu (Set-Cookie) - hiçbir rota session'dan okumuyor
 
         analysis_result = analyze_from_database()
 
@@ -112,25 +249,32 @@ def analyze():
         tahminler = []
 
         if analysis_result['toplam_yakit'] > 0 and len(analysis_result.get('plakalar', [])) > 0:
-            # Aktif kargo araçlarını al
-            aktif_kargo = get_aktif_kargo_araclari()
-
-            # Tüm yakıt kayıtlarını al
-            yakit_data = fetch_all_paginated('yakit', select='plaka,yakit_miktari',
-                                            filters={'yakit_miktari': 'not.is.null', 'yakit_miktari': 'gt.0'})
-
-            # Plaka bazında yakıt topla
+            # Aktif araç listesi ile yakıt kayıtları bağımsız - iki istek
+            # aynı anda gider. Aynı dict anahtarına iki koşul yazmak ilkini
+            # siliyordu; çift listesi her iki filtreyi de sunucuya iletir
+            with ThreadPoolExecutor(max_workers=2) as ex:
+                aktif_future = ex.submit(get_aktif_kargo_araclari)
+                yakit_data = fetch_all_paginated('yakit', select='plaka,yakit_miktari',
+                                                filters=[('yakit_miktari', 'gt.0'),
+                                                         ('plaka', 'not.is.null')])
+                aktif_kargo = aktif_future.result()
+
+            # Plaka bazında yakıt topla (pandas groupby - C seviyesinde toplama)
             plaka_yakit = {}
-            for row in yakit_data:
-                plaka_str = str(row['plaka'])
-                yakit = float(row['yakit_miktari']) if row.get('yakit_miktari') else 0
-                if yakit > 0:
-                    plaka_yakit[plaka_str] = plaka_yakit.get(plaka_str, 0) + yakit
+            if yakit_data:
+                df = pd.DataFrame(yakit_data)
+                df['yakit_miktari'] = pd.to_numeric(df['yakit_miktari'], errors='coerce').fillna(0)
+                # Düşük kardinaliteli plaka kolonu category olarak gruplansın -
+                # satır başına string hash yerine int kod üzerinden toplama
+                df['plaka'] = df['plaka'].astype(str).astype('category')
+                plaka_yakit = df.groupby('plaka', observed=True, sort=False)['yakit_miktari'].sum().to_dict()
+
+            # Tüm plakaların gerçek km'lerini tek sorguda hesapla
+            gercek_km_map = hesapla_gercek_km_bulk(list(plaka_yakit), baslangic_tarihi, bitis_tarihi)
 
             # Her plaka için tahmin yap
             for plaka_str, toplam_yakit in plaka_yakit.items():
-                # Gerçek km hesapla
-                gercek_km = hesapla_gercek_km(plaka_str, baslangic_tarihi, bitis_tarihi)
+                gercek_km = gercek_km_map.get(plaka_str, 0)
 
                 # Gerçek ortalama hesapla
                 if gercek_km > 0:
@@ -209,7 +353,7 @@ def api_araclar():
     """Araç listesi API"""
     try:
         araclar = get_all_araclar()
-        return jsonify({'status': 'success', 'araclar': araclar})
+        return _onbellekli_yanit(jsonify({'status': 'success', 'araclar': araclar}))
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)})
 
@@ -294,7 +438,7 @@ def api_muhasebe_hesapla():
         plaka = data.get('plaka')
 
         result = get_muhasebe_data(baslangic, bitis, plaka)
-        return jsonify(result)
+        return ojsonify(result)
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)})
 
@@ -336,24 +480,13 @@ def muhasebe_export_pdf():
         if result['status'] == 'error':
             return jsonify({'status': 'error', 'message': result['message']})
 
-        # PDF oluştur
-        buffer = io.BytesIO()
+        # PDF oluştur - küçük raporlar RAM'de kalır, büyükler diske taşar
+        buffer = SpooledTemporaryFile(max_size=2_000_000, mode='w+b')
         doc = SimpleDocTemplate(buffer, pagesize=landscape(A4))
         elements = []
 
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            textColor=colors.HexColor('#2c3e50'),
-            spaceAfter=30,
-            alignment=1
-        )
-
         # Başlık
-        title = Paragraph("MUHASEBE RAPORU", title_style)
-        elements.append(title)
+        elements.append(_MUHASEBE_TITLE_PARA)
         elements.append(Spacer(1, 20))
 
         # Özet bilgiler
@@ -365,48 +498,35 @@ def muhasebe_export_pdf():
         ]
 
         ozet_table = Table(ozet_data, colWidths=[10*cm, 10*cm])
-        ozet_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        ozet_table.setStyle(_OZET_TABLE_STYLE)
 
         elements.append(ozet_table)
         elements.append(Spacer(1, 30))
 
         # Plaka bazlı detay
         if result.get('plaka_bazli'):
-            plaka_baslik = Paragraph("Plaka Bazlı Detay", styles['Heading2'])
-            elements.append(plaka_baslik)
+            elements.append(_PLAKA_DETAY_PARA)
             elements.append(Spacer(1, 10))
 
-            plaka_data = [['Plaka', 'Gelir (₺)', 'Gider (₺)', 'Kar (₺)']]
-
-            for plaka_str, values in result['plaka_bazli'].items():
-                plaka_data.append([
-                    plaka_str,
-                    f"{values['gelir']:,.2f}",
-                    f"{values['gider']:,.2f}",
-                    f"{values['kar']:,.2f}"
-                ])
-
-            plaka_table = Table(plaka_data, colWidths=[5*cm, 5*cm, 5*cm, 5*cm])
-            plaka_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-
-            elements.append(plaka_table)
+            # Satırları pandas ile toplu formatla (hücre başına f-string yerine)
+            df_plaka = pd.DataFrame.from_dict(result['plaka_bazli'], orient='index')
+            baslik_satiri = ['Plaka', 'Gelir (₺)', 'Gider (₺)', 'Kar (₺)']
+            plaka_satirlari = list(zip(
+                df_plaka.index,
+                df_plaka['gelir'].map('{:,.2f}'.format),
+                df_plaka['gider'].map('{:,.2f}'.format),
+                df_plaka['kar'].map('{:,.2f}'.format)
+            ))
+
+            # Tek dev Table yerine ~50 satırlık dilimler: ReportLab her dilimi
+            # bağımsız yerleştirir, büyük raporlarda sayfa bölme maliyeti ve
+            # satır ara bellekleri sınırlı kalır
+            for i in range(0, len(plaka_satirlari), 50):
+                dilim = [baslik_satiri] + plaka_satirlari[i:i + 50]
+                plaka_table = Table(dilim, colWidths=[5*cm, 5*cm, 5*cm, 5*cm],
+                                    repeatRows=1)
+                plaka_table.setStyle(_PLAKA_TABLE_STYLE)
+                elements.append(plaka_table)
 
         doc.build(elements)
         buffer.seek(0)
@@ -437,18 +557,44 @@ def api_performans_hesapla():
         baslangic = data.get('baslangic_tarihi')
         bitis = data.get('bitis_tarihi')
 
-        # Yakıt verilerini al
-        filters = {'plaka': f'eq.{plaka}'}
-        if baslangic:
-            filters['islem_tarihi'] = f'gte.{baslangic}'
-        if bitis:
-            filters['islem_tarihi'] = f'lte.{bitis}'
+        # Önce toplama işini veritabanında yapan RPC denenir - ağdan satırlar
+        # değil birkaç skaler geçer
+        ozet = get_performans_ozeti(plaka, baslangic, bitis)
+
+        if ozet is not None:
+            toplam_yakit = ozet['toplam_yakit']
+            toplam_maliyet = ozet['toplam_maliyet']
+            kayit_sayisi = ozet['kayit_sayisi']
+            aylik_dagilim = {ay: {'yakit': degerler.get('yakit', 0), 'maliyet': degerler.get('maliyet', 0)}
+                             for ay, degerler in sorted(ozet['aylik'].items())}
+        else:
+            # Yakıt verilerini al - iki tarih sınırı tek and= filtresiyle gider,
+            # aynı anahtara iki kez yazmak ikinci sınırı eziyordu
+            filters = _tarih_filtresi_ekle({'plaka': f'eq.{plaka}'}, baslangic, bitis)
+
+            yakit_data = fetch_all_paginated('yakit', select='islem_tarihi,yakit_miktari,satir_tutari',
+                                             filters=filters, order='islem_tarihi.asc')
+
+            # Hesaplamalar - veri tek DataFrame'e alınır, toplamlar ve aylık
+            # dağılım aynı kopya üzerinden çıkar (üç ayrı satır taraması yerine)
+            toplam_yakit = 0.0
+            toplam_maliyet = 0.0
+            aylik_dagilim = {}
+            kayit_sayisi = len(yakit_data)
+
+            if yakit_data:
+                df = pd.DataFrame(yakit_data)
+                df[['yakit_miktari', 'satir_tutari']] = df[['yakit_miktari', 'satir_tutari']].apply(
+                    pd.to_numeric, errors='coerce').fillna(0)
 
-        yakit_data = fetch_all_paginated('yakit', filters=filters, order='islem_tarihi.asc')
+                toplam_yakit = float(df['yakit_miktari'].sum())
+                toplam_maliyet = float(df['satir_tutari'].sum())
+
+                df['ay'] = df['islem_tarihi'].astype(str).str.slice(0, 7)  # YYYY-MM
+                aylik = df[df['ay'] != ''].groupby('ay', sort=True)[['yakit_miktari', 'satir_tutari']].sum()
+                aylik_dagilim = {ay: {'yakit': degerler['yakit_miktari'], 'maliyet': degerler['satir_tutari']}
+                                 for ay, degerler in aylik.to_dict('index').items()}
 
-        # Hesaplamalar
-        toplam_yakit = sum(float(row.get('yakit_miktari', 0) or 0) for row in yakit_data)
-        toplam_maliyet = sum(float(row.get('satir_tutari', 0) or 0) for row in yakit_data)
         gercek_km = hesapla_gercek_km(plaka, baslangic, bitis)
 
         if gercek_km > 0 and toplam_yakit > 0:
@@ -456,16 +602,6 @@ def api_performans_hesapla():
         else:
             ort_tuketim = 0
 
-        # Aylık dağılım
-        aylik_dagilim = {}
-        for row in yakit_data:
-            tarih = row.get('islem_tarihi', '')[:7]  # YYYY-MM
-            if tarih:
-                if tarih not in aylik_dagilim:
-                    aylik_dagilim[tarih] = {'yakit': 0, 'maliyet': 0}
-                aylik_dagilim[tarih]['yakit'] += float(row.get('yakit_miktari', 0) or 0)
-                aylik_dagilim[tarih]['maliyet'] += float(row.get('satir_tutari', 0) or 0)
-
         return jsonify({
             'status': 'success',
             'plaka': plaka,
@@ -474,7 +610,7 @@ def api_performans_hesapla():
             'gercek_km': round(gercek_km, 2),
             'ortalama_tuketim': round(ort_tuketim, 2),
             'aylik_dagilim': aylik_dagilim,
-            'kayit_sayisi': len(yakit_data)
+            'kayit_sayisi': kayit_sayisi
         })
 
     except Exception as e:
@@ -489,14 +625,23 @@ def performans_detay(plaka):
         arac_data = fetch_all_paginated('araclar', filters={'plaka': f'eq.{plaka}'})
         arac = arac_data[0] if arac_data else {'plaka': plaka, 'arac_tipi': 'Bilinmiyor'}
 
-        # Yakıt verileri
-        yakit_data = fetch_all_paginated('yakit',
-                                        filters={'plaka': f'eq.{plaka}'},
-                                        order='islem_tarihi.desc')
+        # Görünen liste yalnızca son 50 kayıt - tüm geçmişi çekmeye gerek yok
+        yakit_kayitlari = fetch_all_paginated(
+            'yakit', select='islem_tarihi,yakit_miktari,satir_tutari,km_bilgisi',
+            filters={'plaka': f'eq.{plaka}'}, order='islem_tarihi.desc', limit=50)
+
+        # Toplamlar veritabanında hesaplanır; RPC yoksa satırlar çekilip
+        # NumPy ile toplanır
+        ozet = get_performans_ozeti(plaka)
+        if ozet is not None:
+            toplam_yakit = ozet['toplam_yakit']
+            toplam_maliyet = ozet['toplam_maliyet']
+        else:
+            yakit_data = fetch_all_paginated('yakit', select='yakit_miktari,satir_tutari',
+                                             filters={'plaka': f'eq.{plaka}'})
+            toplam_yakit = _sum_col(yakit_data, 'yakit_miktari')
+            toplam_maliyet = _sum_col(yakit_data, 'satir_tutari')
 
-        # Temel metrikler
-        toplam_yakit = sum(float(row.get('yakit_miktari', 0) or 0) for row in yakit_data)
-        toplam_maliyet = sum(float(row.get('satir_tutari', 0) or 0) for row in yakit_data)
         gercek_km = hesapla_gercek_km(plaka)
 
         if gercek_km > 0:
@@ -506,7 +651,7 @@ def performans_detay(plaka):
 
         return render_template('performans_detay.html',
                              arac=arac,
-                             yakit_kayitlari=yakit_data[:50],  # Son 50 kayıt
+                             yakit_kayitlari=yakit_kayitlari,
                              toplam_yakit=round(toplam_yakit, 2),
                              toplam_maliyet=round(toplam_maliyet, 2),
                              gercek_km=round(gercek_km, 2),
@@ -522,6 +667,95 @@ def performans_karsilastirma():
     plakalar = get_all_plakas()
     return render_template('performans_karsilastirma.html', plakalar=plakalar)
 
+def _sum_col(rows, col):
+    """Satır listesindeki bir sayısal kolonu NumPy ile topla"""
+    return float(np.fromiter((row.get(col) or 0 for row in rows),
+                             dtype=np.float64, count=len(rows)).sum())
+
+def _dosya_yaniti(buffer, mimetype, dosya_adi, chunk=65536):
+    """Tamponu parça parça akıtan indirme yanıtı oluştur
+
+    Dosyanın tamamını yanıt gövdesine kopyalamak yerine chunk'lar
+    üretildikçe gönderilir; küçük dosyalar RAM'de, büyükler diskte kalır.
+    """
+    def akis():
+        with buffer:
+            buffer.seek(0)
+            while True:
+                parca = buffer.read(chunk)
+                if not parca:
+                    break
+                yield parca
+
+    return Response(stream_with_context(akis()), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={dosya_adi}'})
+
+def _pdf_sayi_kolonu(seri, fmt, bos='-'):
+    """PDF tablosu için sayısal kolonu toplu formatla
+
+    Pozitif değerler fmt ile yazılır, olmayan/pozitif olmayanlar 'bos' olur.
+    """
+    if seri is None:
+        return bos
+    sayilar = pd.to_numeric(seri, errors='coerce').fillna(0)
+    return np.where(sayilar > 0, sayilar.map(fmt.format), bos)
+
+def _tarih_filtresi_ekle(filters, baslangic, bitis, kolon='islem_tarihi'):
+    """Tarih aralığını PostgREST filtresine çevir
+
+    İki sınır birden varsa 'and=(...)' sözdizimi kullanılır; aynı kolon
+    adıyla iki kez dict'e yazmak ikinci değerin ilkini ezmesine yol açıyordu.
+    """
+    if baslangic and bitis:
+        filters['and'] = f'({kolon}.gte.{baslangic},{kolon}.lte.{bitis})'
+    elif baslangic:
+        filters[kolon] = f'gte.{baslangic}'
+    elif bitis:
+        filters[kolon] = f'lte.{bitis}'
+    return filters
+
+def _performans_karsilastir_toplu(plakalar, baslangic, bitis):
+    """Plaka listesinin performans özetlerini iki toplu sorguyla hesapla
+
+    Plaka başına ayrı istek yerine tek in.() sorgusu + groupby; km'ler
+    zaten toplu hesaplanıyor. K plaka için 2K tur yerine 2 tur.
+    """
+    plaka_listesi = [str(p) for p in plakalar]
+    filters = _tarih_filtresi_ekle({'plaka': f'in.({",".join(plaka_listesi)})'},
+                                   baslangic, bitis)
+    yakit_data = fetch_all_paginated('yakit', select='plaka,yakit_miktari,satir_tutari',
+                                     filters=filters)
+    gercek_km_map = hesapla_gercek_km_bulk(plaka_listesi, baslangic, bitis)
+
+    ozet = {}
+    if yakit_data:
+        df = pd.DataFrame(yakit_data)
+        df['plaka'] = df['plaka'].astype(str).astype('category')
+        for kolon in ('yakit_miktari', 'satir_tutari'):
+            df[kolon] = pd.to_numeric(df[kolon], errors='coerce').fillna(0)
+        ozet = df.groupby('plaka', observed=True, sort=False)[
+            ['yakit_miktari', 'satir_tutari']].sum().to_dict('index')
+
+    sonuclar = []
+    for plaka in plaka_listesi:
+        satir = ozet.get(plaka, {})
+        toplam_yakit = float(satir.get('yakit_miktari', 0))
+        gercek_km = gercek_km_map.get(plaka, 0)
+
+        if gercek_km > 0:
+            ort_tuketim = toplam_yakit / (gercek_km / 100)
+        else:
+            ort_tuketim = 0
+
+        sonuclar.append({
+            'plaka': plaka,
+            'toplam_yakit': round(toplam_yakit, 2),
+            'toplam_maliyet': round(float(satir.get('satir_tutari', 0)), 2),
+            'gercek_km': round(gercek_km, 2),
+            'ortalama_tuketim': round(ort_tuketim, 2)
+        })
+    return sonuclar
+
 @app.route('/api/performans/karsilastir', methods=['POST'])
 def api_performans_karsilastir():
     """Çoklu araç performans karşılaştırma"""
@@ -531,35 +765,9 @@ def api_performans_karsilastir():
         baslangic = data.get('baslangic_tarihi')
         bitis = data.get('bitis_tarihi')
 
-        sonuclar = []
-
-        for plaka in plakalar:
-            filters = {'plaka': f'eq.{plaka}'}
-            if baslangic:
-                filters['islem_tarihi'] = f'gte.{baslangic}'
-            if bitis:
-                filters['islem_tarihi'] = f'lte.{bitis}'
-
-            yakit_data = fetch_all_paginated('yakit', filters=filters)
+        sonuclar = _performans_karsilastir_toplu(plakalar, baslangic, bitis) if plakalar else []
 
-            toplam_yakit = sum(float(row.get('yakit_miktari', 0) or 0) for row in yakit_data)
-            toplam_maliyet = sum(float(row.get('satir_tutari', 0) or 0) for row in yakit_data)
-            gercek_km = hesapla_gercek_km(plaka, baslangic, bitis)
-
-            if gercek_km > 0:
-                ort_tuketim = toplam_yakit / (gercek_km / 100)
-            else:
-                ort_tuketim = 0
-
-            sonuclar.append({
-                'plaka': plaka,
-                'toplam_yakit': round(toplam_yakit, 2),
-                'toplam_maliyet': round(toplam_maliyet, 2),
-                'gercek_km': round(gercek_km, 2),
-                'ortalama_tuketim': round(ort_tuketim, 2)
-            })
-
-        return jsonify({'status': 'success', 'sonuclar': sonuclar})
+        return ojsonify({'status': 'success', 'sonuclar': sonuclar})
 
     except Exception as e:
         logger.error(f"Karşılaştırma hatası: {str(e)}")
@@ -583,30 +791,40 @@ def api_veri_yukle():
         if file.filename == '':
             return jsonify({'status': 'error', 'message': 'Dosya adı boş'})
 
-        # Excel dosyasını oku
-        df = pd.read_excel(file)
+        # Excel dosyasını satır satır oku (tüm dosyayı belleğe almadan)
+        wb = load_workbook(file, read_only=True, data_only=True)
+        ws = wb.active
 
-        # Sütun adlarını küçük harfe çevir ve boşlukları alt çizgi ile değiştir
-        df.columns = df.columns.str.lower().str.replace(' ', '_')
+        satirlar = ws.iter_rows(values_only=True)
+        header = [str(c).lower().replace(' ', '_') for c in next(satirlar)]
 
-        # NaN değerleri None'a çevir
-        df = df.where(pd.notnull(df), None)
+        # Batch'leri paralel olarak Supabase'e yükle (sıralı HTTP turu yerine)
+        batch_size = 500
+        total_uploaded = 0
+        batch = []
+        futures = []
 
-        # Dictionary listesine çevir
-        records = df.to_dict('records')
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for row in satirlar:
+                batch.append({kolon: (deger.isoformat() if isinstance(deger, datetime) else deger)
+                              for kolon, deger in zip(header, row)})
 
-        # Batch olarak Supabase'e yükle
-        batch_size = 100
-        total_uploaded = 0
+                if len(batch) >= batch_size:
+                    futures.append((executor.submit(supabase_insert_batch, tablo, batch), len(batch)))
+                    batch = []
+
+            if batch:
+                futures.append((executor.submit(supabase_insert_batch, tablo, batch), len(batch)))
 
-        for i in range(0, len(records), batch_size):
-            batch = records[i:i + batch_size]
-            success = supabase_insert_batch(tablo, batch)
-            if success:
-                total_uploaded += len(batch)
+            for future, adet in futures:
+                if future.result():
+                    total_uploaded += adet
+
+        wb.close()
 
         # İşlem kaydı tut
         record_processed_file(file.filename, tablo, total_uploaded)
+        _analiz_cache.clear()  # yeni veri geldi - önbellekteki analizler bayat
 
         return jsonify({
             'status': 'success',
@@ -639,8 +857,6 @@ def anomaly_dashboard():
 def api_ai_predict():
     """AI tahmin API"""
     try:
-        from ai_model import predict_fuel_consumption
-
         data = request.get_json()
         result = predict_fuel_consumption(
             plaka=data.get('plaka'),
@@ -657,8 +873,6 @@ def api_ai_predict():
 def api_ai_anomaly():
     """AI anomali tespit API"""
     try:
-        from ai_model import detect_anomalies
-
         data = request.get_json()
         result = detect_anomalies(
             plaka=data.get('plaka'),
@@ -676,12 +890,10 @@ def api_ai_anomaly():
 def api_ai_bulk_predict():
     """Toplu AI tahmin API"""
     try:
-        from ai_model import bulk_predict_all_vehicles
-
         data = request.get_json()
         result = bulk_predict_all_vehicles(gun_sayisi=int(data.get('gun_sayisi', 30)))
 
-        return jsonify(result)
+        return ojsonify(result)
 
     except Exception as e:
         logger.error(f"AI bulk prediction error: {str(e)}")
@@ -691,8 +903,6 @@ def api_ai_bulk_predict():
 def api_ai_chat():
     """AI Asistan chat API"""
     try:
-        from ollama_assistant import get_assistant_response
-
         data = request.get_json()
         question = data.get('question', '')
         context = data.get('context', {})
@@ -704,12 +914,75 @@ def api_ai_chat():
         logger.error(f"AI chat error: {str(e)}")
         return jsonify({'status': 'error', 'message': str(e)})
 
+# Aynı filtrelerle art arda yapılan analizler (sayfa + hemen ardından export)
+# hesabı tekrarlamasın diye kısa süreli sonuç önbelleği
+_ANALIZ_CACHE_TTL = 60  # saniye
+_analiz_cache = {}
+
+def _arac_analiz_toplu(plakalar, baslangic_tarihi, bitis_tarihi):
+    """Seçili plakaların yakıt/km özetini hesapla (binek ve iş makinesi analizleri için)
+
+    Plaka başına ayrı sorgu yerine tüm yakıt satırları tek in.() sorgusuyla
+    çekilir, toplamlar groupby ile ve km'ler hesapla_gercek_km_bulk ile çıkar.
+    Sonuç (plakalar, tarih aralığı) anahtarıyla TTL süresince önbellekte tutulur.
+    """
+    if not plakalar:
+        return [], {'toplam_yakit': 0.0, 'toplam_alim': 0, 'plakalar': [], 'tahminler': []}
+
+    cache_key = (tuple(plakalar), baslangic_tarihi, bitis_tarihi)
+    onbellek = _analiz_cache.get(cache_key)
+    if onbellek and time.time() - onbellek[0] < _ANALIZ_CACHE_TTL:
+        return onbellek[1]
+
+    plaka_listesi = ','.join(str(p) for p in plakalar)
+    filters = _tarih_filtresi_ekle({'plaka': f'in.({plaka_listesi})'},
+                                   baslangic_tarihi, bitis_tarihi)
+    yakit_data = fetch_all_paginated('yakit', select='plaka,yakit_miktari', filters=filters)
+    km_map = hesapla_gercek_km_bulk(plakalar, baslangic_tarihi, bitis_tarihi)
+
+    ozet = {}
+    if yakit_data:
+        df = pd.DataFrame(yakit_data)
+        df['yakit_miktari'] = pd.to_numeric(df['yakit_miktari'], errors='coerce').fillna(0)
+        df['plaka'] = df['plaka'].astype(str).astype('category')
+        agg = df.groupby('plaka', observed=True, sort=False)['yakit_miktari'].agg(
+            toplam_yakit='sum', yakit_alimlari='size', ortalama_yakit='mean')
+        ozet = agg.to_dict('index')
+
+    detaylar = []
+    tahminler = []
+    for plaka in plakalar:
+        plaka_ozet = ozet.get(str(plaka), {})
+        toplam_yakit = float(plaka_ozet.get('toplam_yakit', 0))
+        toplam_km = km_map.get(str(plaka), 0)
+        ortalama_yakit = float(plaka_ozet.get('ortalama_yakit', 0))
+        tahminler.append(round(ortalama_yakit, 2))
+
+        detaylar.append({
+            'plaka': plaka,
+            'toplam_yakit': toplam_yakit,
+            'toplam_km': toplam_km,
+            'ortalama_yakit': ortalama_yakit,
+            'yakit_alimlari': int(plaka_ozet.get('yakit_alimlari', 0)),
+            'tuketim_100km': (toplam_yakit / toplam_km * 100) if toplam_km > 0 else 0
+        })
+
+    # Genel toplamlar sonuç listesini yeniden tarayarak değil groupby
+    # çıktısından tek C-düzeyi indirgeme ile hesaplanır
+    toplamlar = {
+        'toplam_yakit': float(agg['toplam_yakit'].sum()) if ozet else 0.0,
+        'toplam_alim': int(agg['yakit_alimlari'].sum()) if ozet else 0,
+        'plakalar': list(plakalar),
+        'tahminler': tahminler
+    }
+
+    _analiz_cache[cache_key] = (time.time(), (detaylar, toplamlar))
+    return detaylar, toplamlar
+
 @app.route('/binek-arac-analizi', methods=['GET', 'POST'])
 def binek_arac_analizi():
     """Binek araç analizi"""
     try:
-        from database import get_aktif_binek_araclar, get_yakit_by_plaka, hesapla_gercek_km
-
         baslangic_tarihi = request.form.get('baslangic_tarihi') if request.method == 'POST' else None
         bitis_tarihi = request.form.get('bitis_tarihi') if request.method == 'POST' else None
         plaka_filtre = request.form.get('plaka') if request.method == 'POST' else None
@@ -721,37 +994,13 @@ def binek_arac_analizi():
             flash('⚠️ Aktif binek araç bulunamadı', 'warning')
             return render_template('result.html', arac_detaylari=[], genel_ozet={'arac_tipi': 'Binek Araç', 'toplam_arac': 0, 'toplam_yakit': 0})
 
-        arac_detaylari = []
-        toplam_yakit_genel = 0
-
-        for plaka in aktif_binek:
-            if plaka_filtre and plaka != plaka_filtre:
-                continue
-
-            yakit_data = get_yakit_by_plaka(plaka)
-
-            if baslangic_tarihi or bitis_tarihi:
-                yakit_data = [row for row in yakit_data
-                            if (not baslangic_tarihi or row.get('islem_tarihi', '') >= baslangic_tarihi)
-                            and (not bitis_tarihi or row.get('islem_tarihi', '') <= bitis_tarihi)]
-
-            toplam_yakit = sum(float(row.get('yakit_miktari', 0) or 0) for row in yakit_data)
-            yakit_alimlari = len(yakit_data)
-            ortalama_yakit = toplam_yakit / yakit_alimlari if yakit_alimlari > 0 else 0
-
-            toplam_km = hesapla_gercek_km(plaka, baslangic_tarihi, bitis_tarihi)
-            tuketim = (toplam_yakit / toplam_km * 100) if toplam_km > 0 else 0
+        analiz_plakalar = [p for p in aktif_binek if not plaka_filtre or p == plaka_filtre]
 
-            arac_detaylari.append({
-                'plaka': plaka,
-                'toplam_yakit': toplam_yakit,
-                'toplam_km': toplam_km,
-                'ortalama_yakit': ortalama_yakit,
-                'yakit_alimlari': yakit_alimlari,
-                'tuketim_100km': tuketim
-            })
+        # Plaka başına sorgu yerine tek toplu sorgu + groupby
+        arac_detaylari, toplamlar = _arac_analiz_toplu(analiz_plakalar, baslangic_tarihi, bitis_tarihi)
 
-            toplam_yakit_genel += toplam_yakit
+        toplam_yakit_genel = toplamlar['toplam_yakit']
+        toplam_yakit_alimlari = toplamlar['toplam_alim']
 
         genel_ozet = {
             'toplam_arac': len(arac_detaylari),
@@ -759,10 +1008,6 @@ def binek_arac_analizi():
             'arac_tipi': 'Binek Araç'
         }
 
-        plakalar = [arac['plaka'] for arac in arac_detaylari]
-        tahminler = [round(arac['ortalama_yakit'], 2) for arac in arac_detaylari]
-        toplam_yakit_alimlari = sum(arac['yakit_alimlari'] for arac in arac_detaylari)
-
         return render_template('result.html',
                              arac_detaylari=arac_detaylari,
                              genel_ozet=genel_ozet,
@@ -770,8 +1015,8 @@ def binek_arac_analizi():
                              sefer=toplam_yakit_alimlari,
                              yakit=round(toplam_yakit_genel, 2),
                              ortalama_tahmin=round(toplam_yakit_genel / toplam_yakit_alimlari, 2) if toplam_yakit_alimlari > 0 else 0,
-                             plakalar=plakalar,
-                             tahminler=tahminler)
+                             plakalar=toplamlar['plakalar'],
+                             tahminler=toplamlar['tahminler'])
     except Exception as e:
         logger.error(f"Binek araç analizi hatası: {str(e)}")
         flash(f'❌ Hata: {str(e)}', 'error')
@@ -781,8 +1026,6 @@ def binek_arac_analizi():
 def is_makinesi_analizi():
     """İş makinesi analizi"""
     try:
-        from database import get_aktif_is_makineleri, get_yakit_by_plaka, hesapla_gercek_km
-
         baslangic_tarihi = request.form.get('baslangic_tarihi') if request.method == 'POST' else None
         bitis_tarihi = request.form.get('bitis_tarihi') if request.method == 'POST' else None
         plaka_filtre = request.form.get('plaka') if request.method == 'POST' else None
@@ -794,37 +1037,13 @@ def is_makinesi_analizi():
             flash('⚠️ Aktif iş makinesi bulunamadı', 'warning')
             return render_template('result.html', arac_detaylari=[], genel_ozet={'arac_tipi': 'İş Makinesi', 'toplam_arac': 0, 'toplam_yakit': 0})
 
-        arac_detaylari = []
-        toplam_yakit_genel = 0
-
-        for plaka in aktif_makineler:
-            if plaka_filtre and plaka != plaka_filtre:
-                continue
-
-            yakit_data = get_yakit_by_plaka(plaka)
-
-            if baslangic_tarihi or bitis_tarihi:
-                yakit_data = [row for row in yakit_data
-                            if (not baslangic_tarihi or row.get('islem_tarihi', '') >= baslangic_tarihi)
-                            and (not bitis_tarihi or row.get('islem_tarihi', '') <= bitis_tarihi)]
+        analiz_plakalar = [p for p in aktif_makineler if not plaka_filtre or p == plaka_filtre]
 
-            toplam_yakit = sum(float(row.get('yakit_miktari', 0) or 0) for row in yakit_data)
-            yakit_alimlari = len(yakit_data)
-            ortalama_yakit = toplam_yakit / yakit_alimlari if yakit_alimlari > 0 else 0
+        # Plaka başına sorgu yerine tek toplu sorgu + groupby
+        arac_detaylari, toplamlar = _arac_analiz_toplu(analiz_plakalar, baslangic_tarihi, bitis_tarihi)
 
-            toplam_km = hesapla_gercek_km(plaka, baslangic_tarihi, bitis_tarihi)
-            tuketim = (toplam_yakit / toplam_km * 100) if toplam_km > 0 else 0
-
-            arac_detaylari.append({
-                'plaka': plaka,
-                'toplam_yakit': toplam_yakit,
-                'toplam_km': toplam_km,
-                'ortalama_yakit': ortalama_yakit,
-                'yakit_alimlari': yakit_alimlari,
-                'tuketim_100km': tuketim
-            })
-
-            toplam_yakit_genel += toplam_yakit
+        toplam_yakit_genel = toplamlar['toplam_yakit']
+        toplam_yakit_alimlari = toplamlar['toplam_alim']
 
         genel_ozet = {
             'toplam_arac': len(arac_detaylari),
@@ -832,10 +1051,6 @@ def is_makinesi_analizi():
             'arac_tipi': 'İş Makinesi'
         }
 
-        plakalar = [arac['plaka'] for arac in arac_detaylari]
-        tahminler = [round(arac['ortalama_yakit'], 2) for arac in arac_detaylari]
-        toplam_yakit_alimlari = sum(arac['yakit_alimlari'] for arac in arac_detaylari)
-
         return render_template('result.html',
                              arac_detaylari=arac_detaylari,
                              genel_ozet=genel_ozet,
@@ -843,142 +1058,251 @@ def is_makinesi_analizi():
                              sefer=toplam_yakit_alimlari,
                              yakit=round(toplam_yakit_genel, 2),
                              ortalama_tahmin=round(toplam_yakit_genel / toplam_yakit_alimlari, 2) if toplam_yakit_alimlari > 0 else 0,
-                             plakalar=plakalar,
-                             tahminler=tahminler)
+                             plakalar=toplamlar['plakalar'],
+                             tahminler=toplamlar['tahminler'])
     except Exception as e:
         logger.error(f"İş makinesi analizi hatası: {str(e)}")
         flash(f'❌ Hata: {str(e)}', 'error')
         return redirect(url_for('index'))
 
+# Excel/PDF üretimi istek thread'ini saniyelerce kilitleyebiliyor - işler
+# arka plan havuzuna verilir, indirme ayrı bir GET ile yapılır
+_EXPORT_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+_export_jobs = {}
+
+# gunicorn birden fazla worker çalıştırır (--workers 2); POST'un düştüğü
+# süreç ile GET'in düştüğü süreç aynı olmayabilir. Biten dosyalar job_id
+# ile bu dizine yazılır ki her worker indirmeyi karşılayabilsin
+_EXPORT_SPOOL = os.path.join(gettempdir(), 'kargo_exports')
+os.makedirs(_EXPORT_SPOOL, exist_ok=True)
+_EXPORT_JOB_TTL = 600
+
+def _export_spool_yaz(job_id, tur, buffer):
+    """Biten exportu diske yaz (atomik: yarım dosya asla görünmez)"""
+    gecici = os.path.join(_EXPORT_SPOOL, f'{job_id}.{tur}.tmp')
+    kalici = os.path.join(_EXPORT_SPOOL, f'{job_id}.{tur}')
+    buffer.seek(0)
+    with open(gecici, 'wb') as f:
+        while parca := buffer.read(65536):
+            f.write(parca)
+    os.replace(gecici, kalici)
+    return buffer
+
+def _export_spool_bekle(job_id, zaman_asimi=120):
+    """Başka worker'ın ürettiği export dosyasını diskte bekle
+
+    Returns:
+        tuple: (tur, buffer) - dosya süre içinde belirmezse (None, None)
+    """
+    son = time.time() + zaman_asimi
+    while True:
+        for tur in ('xlsx', 'pdf'):
+            yol = os.path.join(_EXPORT_SPOOL, f'{job_id}.{tur}')
+            if os.path.exists(yol):
+                with open(yol, 'rb') as f:
+                    return tur, io.BytesIO(f.read())
+        if time.time() >= son:
+            return None, None
+        time.sleep(0.25)
+
+def _export_uret(job_id, tur, anahtar, uretici, *args):
+    """Export dosyasını üret (önbellekten ya da sıfırdan) ve spool'a yaz"""
+    return _export_spool_yaz(job_id, tur, _onbellekli_export(anahtar, uretici, *args))
+
+def _export_isi_ekle(tur, anahtar, uretici, *args):
+    """Export işini havuza ver ve kaydet, eski işleri/dosyaları temizle"""
+    simdi = time.time()
+    for eski_id in [jid for jid, (_, _, t) in _export_jobs.items() if simdi - t > _EXPORT_JOB_TTL]:
+        _export_jobs.pop(eski_id, None)
+    for dosya in os.listdir(_EXPORT_SPOOL):
+        yol = os.path.join(_EXPORT_SPOOL, dosya)
+        try:
+            if simdi - os.path.getmtime(yol) > _EXPORT_JOB_TTL:
+                os.remove(yol)
+        except OSError:
+            pass
+
+    job_id = uuid.uuid4().hex
+    future = _EXPORT_EXECUTOR.submit(_export_uret, job_id, tur, anahtar, uretici, *args)
+    _export_jobs[job_id] = (tur, future, simdi)
+    return job_id
+
+# Kullanıcılar aynı raporu arka arkaya indirebiliyor; payload özeti üzerinden
+# üretilen dosya baytları kısa süreli saklanır, tekrar tıklamada pipeline çalışmaz
+_export_onbellek = {}
+_EXPORT_ONBELLEK_TTL = 600
+
+def _onbellekli_export(anahtar, uretici, *args):
+    """Aynı payload için export dosyasını yeniden üretmek yerine baytları döndür"""
+    simdi = time.time()
+    giris = _export_onbellek.get(anahtar)
+    if giris and simdi - giris[0] < _EXPORT_ONBELLEK_TTL:
+        return io.BytesIO(giris[1])
+
+    buffer = uretici(*args)
+    buffer.seek(0)
+    icerik = buffer.read()
+
+    for eski in [k for k, (t, _) in _export_onbellek.items() if simdi - t > _EXPORT_ONBELLEK_TTL]:
+        _export_onbellek.pop(eski, None)
+    _export_onbellek[anahtar] = (simdi, icerik)
+    return io.BytesIO(icerik)
+
+def _build_excel(arac_detaylari):
+    """Analiz sonuçlarından Excel dosyası üret (arka plan işi)"""
+    excel_data = []
+    for arac in arac_detaylari:
+        row = {'Plaka': arac.get('plaka', ''), 'Toplam Yakıt (L)': arac.get('toplam_yakit', 0)}
+
+        if 'sefer_sayisi' in arac:
+            row['Toplam KM'] = arac.get('toplam_km', 0) or 0
+            row['Toplam Sefer'] = arac.get('sefer_sayisi', 0)
+            row['KG Toplam'] = arac.get('kg_toplam', 0) or 0
+            row['Ortalama Yakıt (L)'] = arac.get('ortalama_yakit', 0)
+            row['KM/Litre'] = arac.get('km_litre_orani', 0) or 0
+        else:
+            row['Toplam KM'] = arac.get('toplam_km', 0) or 0
+            row['Yakıt Alımları'] = arac.get('yakit_alimlari', 0)
+            row['Ortalama Yakıt (L)'] = arac.get('ortalama_yakit', 0)
+            row['Tüketim (L/100km)'] = arac.get('tuketim_100km', 0) or 0
+
+        excel_data.append(row)
+
+    df = pd.DataFrame(excel_data)
+    output = SpooledTemporaryFile(max_size=1_000_000, mode='w+b')
+
+    # constant_memory: satırlar yazıldıkça akışa gider, çalışma kitabının
+    # tamamı RAM'de tutulmaz (büyük dışa aktarımlarda bellek sabit kalır)
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    worksheet = workbook.add_worksheet('Analiz Sonuçları')
+
+    header_format = workbook.add_format({'bold': True, 'bg_color': '#4CAF50', 'font_color': 'white', 'border': 1, 'align': 'center'})
+    number_format = workbook.add_format({'num_format': '#,##0.00'})
+
+    # constant_memory geriye dönük yazmaya izin vermez - başlık önce
+    worksheet.write_row(0, 0, df.columns.tolist(), header_format)
+    for col_num in range(len(df.columns)):
+        worksheet.set_column(col_num, col_num, 18,
+                             number_format if col_num > 0 else None)
+
+    for row_num, row in enumerate(df.itertuples(index=False), start=1):
+        worksheet.write_row(row_num, 0, row)
+
+    workbook.close()
+    return output
+
+def _build_pdf(arac_detaylari, analiz_tipi):
+    """Analiz sonuçlarından PDF dosyası üret (arka plan işi)"""
+    buffer = SpooledTemporaryFile(max_size=1_000_000, mode='w+b')
+    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
+    elements = []
+
+    elements.append(_EXPORT_TITLE_PARA)
+    elements.append(Spacer(1, 0.3*cm))
+    elements.append(Paragraph(f'Tarih: {datetime.now().strftime("%d.%m.%Y %H:%M")}', _PDF_STYLES['Normal']))
+    elements.append(Spacer(1, 0.8*cm))
+
+    # Tüm satırlar aynı analizden gelir; ilk kayda bakmak yeterli
+    is_kargo = bool(arac_detaylari) and 'sefer_sayisi' in arac_detaylari[0]
+
+    # Satır satır f-string yerine kolonları toplu formatla
+    pdf_df = pd.DataFrame(arac_detaylari)
+    sira = np.arange(1, len(pdf_df) + 1).astype(str)
+
+    if is_kargo:
+        out = pd.DataFrame({
+            '#': sira,
+            'Plaka': pdf_df.get('plaka', '').fillna(''),
+            'Yakıt (L)': _pdf_sayi_kolonu(pdf_df.get('toplam_yakit'), '{:.1f}', bos='0.0'),
+            'KM': _pdf_sayi_kolonu(pdf_df.get('toplam_km'), '{:.0f}'),
+            'Sefer': pd.to_numeric(pdf_df.get('sefer_sayisi'), errors='coerce').fillna(0).astype(int).astype(str),
+            'KG': _pdf_sayi_kolonu(pdf_df.get('kg_toplam'), '{:.0f}'),
+            'KM/L': _pdf_sayi_kolonu(pdf_df.get('km_litre_orani'), '{:.2f}')
+        })
+        table_data = [out.columns.tolist()] + out.values.tolist()
+        table = Table(table_data, colWidths=[1*cm, 3*cm, 2.2*cm, 2*cm, 1.8*cm, 2.2*cm, 2*cm])
+    else:
+        out = pd.DataFrame({
+            '#': sira,
+            'Plaka': pdf_df.get('plaka', '').fillna(''),
+            'Toplam Yakıt (L)': _pdf_sayi_kolonu(pdf_df.get('toplam_yakit'), '{:.2f}', bos='0.00'),
+            'Toplam KM': _pdf_sayi_kolonu(pdf_df.get('toplam_km'), '{:.0f}'),
+            'Yakıt Alımları': pd.to_numeric(pdf_df.get('yakit_alimlari'), errors='coerce').fillna(0).astype(int).astype(str),
+            'Tüketim (L/100km)': _pdf_sayi_kolonu(pdf_df.get('tuketim_100km'), '{:.2f}')
+        })
+        table_data = [out.columns.tolist()] + out.values.tolist()
+        table = Table(table_data, colWidths=[1*cm, 3.5*cm, 3.5*cm, 3*cm, 3*cm, 3.5*cm])
+
+    table.setStyle(_EXPORT_TABLE_STYLE)
+
+    elements.append(table)
+    doc.build(elements)
+    return buffer
+
 @app.route('/export-excel', methods=['POST'])
 def export_excel():
-    """Analiz sonuçlarını Excel'e dönüştür"""
+    """Analiz sonuçlarını Excel'e dönüştür (arka planda üretilir)"""
     try:
-        data = request.get_json()
+        data = ojson_govde()
         arac_detaylari = data.get('arac_detaylari', [])
 
         if not arac_detaylari:
             return jsonify({'status': 'error', 'message': 'Veri bulunamadı'}), 400
 
-        excel_data = []
-        for arac in arac_detaylari:
-            row = {'Plaka': arac.get('plaka', ''), 'Toplam Yakıt (L)': arac.get('toplam_yakit', 0)}
-
-            if 'sefer_sayisi' in arac:
-                row['Toplam KM'] = arac.get('toplam_km', 0) or 0
-                row['Toplam Sefer'] = arac.get('sefer_sayisi', 0)
-                row['KG Toplam'] = arac.get('kg_toplam', 0) or 0
-                row['Ortalama Yakıt (L)'] = arac.get('ortalama_yakit', 0)
-                row['KM/Litre'] = arac.get('km_litre_orani', 0) or 0
-            else:
-                row['Toplam KM'] = arac.get('toplam_km', 0) or 0
-                row['Yakıt Alımları'] = arac.get('yakit_alimlari', 0)
-                row['Ortalama Yakıt (L)'] = arac.get('ortalama_yakit', 0)
-                row['Tüketim (L/100km)'] = arac.get('tuketim_100km', 0) or 0
-
-            excel_data.append(row)
-
-        df = pd.DataFrame(excel_data)
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            df.to_excel(writer, sheet_name='Analiz Sonuçları', index=False)
-
-            workbook = writer.book
-            worksheet = writer.sheets['Analiz Sonuçları']
-
-            header_format = workbook.add_format({'bold': True, 'bg_color': '#4CAF50', 'font_color': 'white', 'border': 1, 'align': 'center'})
-            number_format = workbook.add_format({'num_format': '#,##0.00'})
-
-            for col_num, value in enumerate(df.columns.values):
-                worksheet.write(0, col_num, value, header_format)
-                worksheet.set_column(col_num, col_num, 18)
-
-                if col_num > 0:
-                    for row_num in range(1, len(df) + 1):
-                        worksheet.write(row_num, col_num, df.iloc[row_num-1, col_num], number_format)
-
-        output.seek(0)
-        return send_file(output, mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                        as_attachment=True, download_name=f'yakit_analizi_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx')
+        anahtar = 'xlsx:' + hashlib.blake2b(request.get_data()).hexdigest()
+        job_id = _export_isi_ekle('xlsx', anahtar, _build_excel, arac_detaylari)
+        return jsonify({'status': 'success', 'job_id': job_id}), 202
     except Exception as e:
         logger.error(f"Excel export error: {str(e)}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 @app.route('/export-pdf', methods=['POST'])
 def export_pdf():
-    """Analiz sonuçlarını PDF'e dönüştür"""
+    """Analiz sonuçlarını PDF'e dönüştür (arka planda üretilir)"""
     try:
-        data = request.get_json()
+        data = ojson_govde()
         arac_detaylari = data.get('arac_detaylari', [])
         analiz_tipi = data.get('analiz_tipi', '')
 
         if not arac_detaylari:
             return jsonify({'status': 'error', 'message': 'Veri bulunamadı'}), 400
 
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
-        elements = []
-
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=18,
-                                     textColor=colors.HexColor('#2C3E50'), spaceAfter=20)
-
-        elements.append(Paragraph('Yakıt Analiz Raporu', title_style))
-        elements.append(Spacer(1, 0.3*cm))
-        elements.append(Paragraph(f'Tarih: {datetime.now().strftime("%d.%m.%Y %H:%M")}', styles['Normal']))
-        elements.append(Spacer(1, 0.8*cm))
-
-        is_kargo = any('sefer_sayisi' in arac for arac in arac_detaylari)
+        anahtar = 'pdf:' + hashlib.blake2b(request.get_data()).hexdigest()
+        job_id = _export_isi_ekle('pdf', anahtar, _build_pdf, arac_detaylari, analiz_tipi)
+        return jsonify({'status': 'success', 'job_id': job_id}), 202
+    except Exception as e:
+        logger.error(f"PDF export error: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
 
-        if is_kargo:
-            table_data = [['#', 'Plaka', 'Yakıt (L)', 'KM', 'Sefer', 'KG', 'KM/L']]
-            for idx, arac in enumerate(arac_detaylari, 1):
-                table_data.append([str(idx), arac.get('plaka', ''), f"{arac.get('toplam_yakit', 0):.1f}",
-                                 f"{arac.get('toplam_km', 0):.0f}" if arac.get('toplam_km', 0) > 0 else '-',
-                                 str(arac.get('sefer_sayisi', 0)),
-                                 f"{arac.get('kg_toplam', 0):.0f}" if arac.get('kg_toplam', 0) > 0 else '-',
-                                 f"{arac.get('km_litre_orani', 0):.2f}" if arac.get('km_litre_orani', 0) > 0 else '-'])
+@app.route('/export/<job_id>')
+def export_download(job_id):
+    """Hazır export dosyasını indir"""
+    try:
+        if not job_id.isalnum():
+            return jsonify({'status': 'error', 'message': 'Export işi bulunamadı'}), 404
 
-            table = Table(table_data, colWidths=[1*cm, 3*cm, 2.2*cm, 2*cm, 1.8*cm, 2.2*cm, 2*cm])
+        job = _export_jobs.pop(job_id, None)
+        if job:
+            tur, future, _ = job
+            buffer = future.result(timeout=120)
         else:
-            arac_tipi = 'İş Makinesi' if analiz_tipi == 'is_makinesi' else 'Binek Araç'
-            table_data = [['#', 'Plaka', 'Toplam Yakıt (L)', 'Toplam KM', 'Yakıt Alımları', 'Tüketim (L/100km)']]
-            for idx, arac in enumerate(arac_detaylari, 1):
-                table_data.append([str(idx), arac.get('plaka', ''), f"{arac.get('toplam_yakit', 0):.2f}",
-                                 f"{arac.get('toplam_km', 0):.0f}" if arac.get('toplam_km', 0) > 0 else '-',
-                                 str(arac.get('yakit_alimlari', 0)),
-                                 f"{arac.get('tuketim_100km', 0):.2f}" if arac.get('tuketim_100km', 0) > 0 else '-'])
-
-            table = Table(table_data, colWidths=[1*cm, 3.5*cm, 3.5*cm, 3*cm, 3*cm, 3.5*cm])
-
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4CAF50')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
-        ]))
-
-        elements.append(table)
-        doc.build(elements)
-        buffer.seek(0)
+            # İş diğer gunicorn worker'ında olabilir; biten dosyayı
+            # spool dizininde bekle
+            tur, buffer = _export_spool_bekle(job_id)
+            if buffer is None:
+                return jsonify({'status': 'error', 'message': 'Export işi bulunamadı'}), 404
+
+        if tur == 'xlsx':
+            mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        else:
+            mimetype = 'application/pdf'
 
-        return send_file(buffer, mimetype='application/pdf', as_attachment=True,
-                        download_name=f'yakit_analizi_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf')
+        dosya_adi = f'yakit_analizi_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{tur}'
+        return _dosya_yaniti(buffer, mimetype, dosya_adi)
     except Exception as e:
-        logger.error(f"PDF export error: {str(e)}")
+        logger.error(f"Export indirme hatası: {str(e)}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
-@app.route('/health')
-def health():
-    """Health check endpoint for Railway"""
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': datetime.now().isoformat()
-    })
-
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
@@ -56,14 +56,6 @@ def hesapla_gercek_km(plaka, conn=None):
         if len(rows) < 2:
             return 0
 
-        # DEBUG: 46AJH283 için detaylı log
-        if plaka == '46AJH283':
-            print(f"\n{'='*60}")
-            print(f"DEBUG: {plaka} için {len(rows)} kayıt bulundu")
-            print(f"{'='*60}")
-            for idx, row in enumerate(rows, 1):
-                print(f"{idx}. KM: {float(row['km_bilgisi']):,.0f}")
-
         # Ardışık kayıtlar arasındaki farkları topla
         toplam_km = 0
         onceki_km = None
@@ -78,20 +70,8 @@ def hesapla_gercek_km(plaka, conn=None):
                 if fark > 0:
                     toplam_km += fark
 
-                    # DEBUG: Pozitif farkları göster
-                    if plaka == '46AJH283':
-                        print(f"  Fark: {onceki_km:,.0f} → {km:,.0f} = +{fark:,.0f} km")
-
             onceki_km = km
 
-        # DEBUG: Sonuç
-        if plaka == '46AJH283':
-            print(f"\nTOPLAM ARDIŞIK FARKLAR: {toplam_km:,.0f} km")
-            print(f"İlk KM: {float(rows[0]['km_bilgisi']):,.0f}")
-            print(f"Son KM: {float(rows[-1]['km_bilgisi']):,.0f}")
-            print(f"Basit Fark: {float(rows[-1]['km_bilgisi']) - float(rows[0]['km_bilgisi']):,.0f} km")
-            print(f"{'='*60}\n")
-
         return toplam_km
 
     finally:
@@ -882,14 +862,6 @@ def hesapla_gercek_km(plaka, conn=None):
         if len(rows) < 2:
             return 0
 
-        # DEBUG: 46AJH283 için detaylı log
-        if plaka == '46AJH283':
-            print(f"\n{'='*60}")
-            print(f"DEBUG: {plaka} için {len(rows)} kayıt bulundu")
-            print(f"{'='*60}")
-            for idx, row in enumerate(rows, 1):
-                print(f"{idx}. KM: {float(row['km_bilgisi']):,.0f}")
-
         # Ardışık kayıtlar arasındaki farkları topla
         toplam_km = 0
         onceki_km = None
@@ -904,20 +876,8 @@ def hesapla_gercek_km(plaka, conn=None):
                 if fark > 0:
                     toplam_km += fark
 
-                    # DEBUG: Pozitif farkları göster
-                    if plaka == '46AJH283':
-                        print(f"  Fark: {onceki_km:,.0f} → {km:,.0f} = +{fark:,.0f} km")
-
             onceki_km = km
 
-        # DEBUG: Sonuç
-        if plaka == '46AJH283':
-            print(f"\nTOPLAM ARDIŞIK FARKLAR: {toplam_km:,.0f} km")
-            print(f"İlk KM: {float(rows[0]['km_bilgisi']):,.0f}")
-            print(f"Son KM: {float(rows[-1]['km_bilgisi']):,.0f}")
-            print(f"Basit Fark: {float(rows[-1]['km_bilgisi']) - float(rows[0]['km_bilgisi']):,.0f} km")
-            print(f"{'='*60}\n")
-
         return toplam_km
 
     finally:
@@ -2,9 +2,14 @@
 Supabase veritabanı işlemleri
 """
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
 from typing import List, Dict, Any, Optional
-import urllib.request
 import json
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
 
 # .env dosyasını manuel oku
 def load_env():
@@ -23,21 +28,49 @@ env = load_env()
 SUPABASE_URL = env.get('VITE_SUPABASE_URL')
 SUPABASE_KEY = env.get('VITE_SUPABASE_ANON_KEY')
 
+# Tek paylaşımlı HTTP oturumu: her çağrıda yeni TLS el sıkışması yerine
+# havuzdaki bağlantılar yeniden kullanılır
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=32))
+_session.headers.update({
+    'apikey': SUPABASE_KEY or '',
+    'Authorization': f'Bearer {SUPABASE_KEY}',
+    'Content-Type': 'application/json'
+})
+_HTTP_TIMEOUT = 30  # saniye
+
+# Basit süreli (TTL) önbellek - her istekte çağrılan ama dakikalar
+# ölçeğinde değişen sorgular (plaka listeleri, veritabanı özeti) için
+_CACHE_TTL = 60  # saniye
+_cache = {}
+
+def _ttl_cached(func):
+    """Fonksiyon sonucunu TTL süresince önbelleğe al"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (func.__name__, args, tuple(sorted(kwargs.items())))
+        item = _cache.get(key)
+        now = time.time()
+        if item and now - item[0] < _CACHE_TTL:
+            return item[1]
+        result = func(*args, **kwargs)
+        _cache[key] = (now, result)
+        return result
+    return wrapper
+
+def clear_cache():
+    """Önbelleği temizle (araç veya veri değişikliklerinden sonra)"""
+    _cache.clear()
+
 def supabase_insert_batch(table: str, data: list):
     """Supabase'e toplu veri ekle"""
     url = f'{SUPABASE_URL}/rest/v1/{table}'
 
-    req = urllib.request.Request(url, method='POST')
-    req.add_header('apikey', SUPABASE_KEY)
-    req.add_header('Authorization', f'Bearer {SUPABASE_KEY}')
-    req.add_header('Content-Type', 'application/json')
-    req.add_header('Prefer', 'return=minimal')
-
-    req.data = json.dumps(data).encode()
-
     try:
-        with urllib.request.urlopen(req) as response:
-            return response.status == 201
+        response = _session.post(url, data=json.dumps(data).encode(),
+                                 headers={'Prefer': 'return=minimal'},
+                                 timeout=_HTTP_TIMEOUT)
+        return response.status_code == 201
     except Exception as e:
         print(f"❌ Batch insert error: {e}")
         return False
@@ -52,6 +85,7 @@ def record_processed_file(filename: str, table_name: str, record_count: int):
             'status': 'success'
         }
         supabase_insert_batch('processed_files', [data])
+        clear_cache()  # yeni veri geldi - önbellekteki km/özet sonuçları bayat
     except:
         pass
 
@@ -63,59 +97,65 @@ def supabase_request(endpoint: str, method: str = 'GET', data: dict = None, para
         query_string = '&'.join([f'{k}={v}' for k, v in params.items()])
         url = f'{url}?{query_string}'
 
-    req = urllib.request.Request(url, method=method)
-    req.add_header('apikey', SUPABASE_KEY)
-    req.add_header('Authorization', f'Bearer {SUPABASE_KEY}')
-    req.add_header('Content-Type', 'application/json')
-    req.add_header('Prefer', 'return=representation')
-
-    if data:
-        req.data = json.dumps(data).encode()
-
-    try:
-        with urllib.request.urlopen(req) as response:
-            return json.loads(response.read().decode())
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode()
-        raise Exception(f"Supabase error: {e.code} - {error_body}")
-
-def fetch_all_paginated(table: str, select: str = '*', filters: dict = None, order: str = None):
-    """Tüm verileri pagination ile çek"""
+    response = _session.request(method, url,
+                                data=json.dumps(data).encode() if data else None,
+                                headers={'Prefer': 'return=representation'},
+                                timeout=_HTTP_TIMEOUT)
+    if response.status_code >= 400:
+        raise Exception(f"Supabase error: {response.status_code} - {response.text}")
+    return response.json()
+
+def supabase_rpc(function: str, args: dict = None):
+    """Supabase RPC (Postgres fonksiyonu) çağır"""
+    url = f'{SUPABASE_URL}/rest/v1/rpc/{function}'
+
+    response = _session.post(url, data=json.dumps(args or {}).encode(),
+                             timeout=_HTTP_TIMEOUT)
+    if response.status_code >= 400:
+        raise Exception(f"Supabase RPC error: {response.status_code} - {response.text}")
+    return response.json()
+
+def fetch_all_paginated(table: str, select: str = '*', filters: dict = None, order: str = None, limit: int = None):
+    """Tüm verileri pagination ile çek (limit verilirse o kadar satırda durur)"""
     all_data = []
     offset = 0
-    limit = 1000
+    sayfa = 1000
 
     while True:
-        url = f'{SUPABASE_URL}/rest/v1/{table}?select={select}&limit={limit}&offset={offset}'
+        istek_limit = sayfa if limit is None else min(sayfa, limit - len(all_data))
+        if istek_limit <= 0:
+            break
+
+        url = f'{SUPABASE_URL}/rest/v1/{table}?select={select}&limit={istek_limit}&offset={offset}'
 
         if filters:
-            for key, value in filters.items():
+            # dict veya (kolon, koşul) çiftleri listesi - liste hali aynı
+            # kolona birden fazla koşul (ör. gt.0 + not.is.null) uygulatır
+            filtre_ciftleri = filters.items() if isinstance(filters, dict) else filters
+            for key, value in filtre_ciftleri:
                 url += f'&{key}={value}'
 
         if order:
             url += f'&order={order}'
 
-        req = urllib.request.Request(url)
-        req.add_header('apikey', SUPABASE_KEY)
-        req.add_header('Authorization', f'Bearer {SUPABASE_KEY}')
-        req.add_header('Content-Type', 'application/json')
-
         try:
-            with urllib.request.urlopen(req) as response:
-                batch = json.loads(response.read().decode())
-                if not batch or len(batch) == 0:
-                    break
-                all_data.extend(batch)
-
-                if len(batch) < limit:
-                    break
-                offset += limit
+            yanit = _session.get(url, timeout=_HTTP_TIMEOUT)
+            yanit.raise_for_status()
+            batch = yanit.json()
+            if not batch or len(batch) == 0:
+                break
+            all_data.extend(batch)
+
+            if len(batch) < istek_limit:
+                break
+            offset += istek_limit
         except Exception as e:
             print(f"Error fetching data: {e}")
             break
 
     return all_data
 
+@_ttl_cached
 def hesapla_gercek_km(plaka: str, baslangic_tarihi: str = None, bitis_tarihi: str = None) -> float:
     """
     Bir aracın gerçek gidilen kilometresini hesapla
@@ -129,17 +169,23 @@ def hesapla_gercek_km(plaka: str, baslangic_tarihi: str = None, bitis_tarihi: st
         float: Toplam gidilen kilometre
     """
     try:
+        # Ardışık farkları veritabanında toplayan pencere fonksiyonu varsa
+        # satırları hiç taşımadan tek skaler döner
+        try:
+            sonuc = supabase_rpc('get_gercek_km', {
+                'p_plaka': plaka, 'p_bas': baslangic_tarihi, 'p_bit': bitis_tarihi})
+            return float(sonuc or 0)
+        except Exception:
+            pass  # fonksiyon henüz kurulmamış olabilir - REST yoluna düş
+
         url = f'{SUPABASE_URL}/rest/v1/yakit?plaka=eq.{plaka}&km_bilgisi=not.is.null&order=islem_tarihi.asc'
 
         if baslangic_tarihi and bitis_tarihi:
             url += f'&islem_tarihi=gte.{baslangic_tarihi}&islem_tarihi=lte.{bitis_tarihi}'
 
-        req = urllib.request.Request(url)
-        req.add_header('apikey', SUPABASE_KEY)
-        req.add_header('Authorization', f'Bearer {SUPABASE_KEY}')
-
-        with urllib.request.urlopen(req) as response:
-            rows = json.loads(response.read().decode())
+        yanit = _session.get(url, timeout=_HTTP_TIMEOUT)
+        yanit.raise_for_status()
+        rows = yanit.json()
 
         if len(rows) < 2:
             return 0
@@ -163,6 +209,69 @@ def hesapla_gercek_km(plaka: str, baslangic_tarihi: str = None, bitis_tarihi: st
         print(f"Error calculating km: {e}")
         return 0
 
+def hesapla_gercek_km_bulk(plakalar: List[str] = None, baslangic_tarihi: str = None, bitis_tarihi: str = None) -> Dict[str, float]:
+    """
+    Tüm araçların gerçek kilometrelerini tek sorguda hesapla
+
+    Plaka başına ayrı istek atmak yerine km kayıtlarını tek seferde çekip
+    plaka bazında ardışık farkları toplar.
+
+    Args:
+        plakalar: Plaka listesi (None ise tüm plakalar)
+        baslangic_tarihi: Başlangıç tarihi (YYYY-MM-DD)
+        bitis_tarihi: Bitiş tarihi (YYYY-MM-DD)
+
+    Returns:
+        dict: {plaka: toplam_km}
+    """
+    try:
+        # Önce pencere fonksiyonlu RPC dene: plaka başına tek satır döner,
+        # ham km kayıtları ağ üzerinden hiç taşınmaz
+        try:
+            sonuc = supabase_rpc('get_gercek_km_bulk', {
+                'p_plakalar': [str(p) for p in plakalar] if plakalar is not None else None,
+                'p_bas': baslangic_tarihi, 'p_bit': bitis_tarihi})
+            km_toplamlari = {row['plaka']: float(row['toplam_km'] or 0) for row in sonuc}
+            if plakalar is not None:
+                return {str(p): km_toplamlari.get(str(p), 0) for p in plakalar}
+            return km_toplamlari
+        except Exception:
+            pass  # fonksiyon henüz kurulmamış olabilir - REST yoluna düş
+
+        filters = {'km_bilgisi': 'gt.0'}
+        if baslangic_tarihi and bitis_tarihi:
+            filters['and'] = f'(islem_tarihi.gte.{baslangic_tarihi},islem_tarihi.lte.{bitis_tarihi})'
+
+        rows = fetch_all_paginated('yakit', select='plaka,islem_tarihi,km_bilgisi',
+                                   filters=filters, order='plaka.asc,islem_tarihi.asc')
+
+        km_toplamlari = {}
+
+        if rows:
+            # Ardışık farkları Python döngüsü yerine NumPy ile topla
+            plaka_arr = np.array([str(row['plaka']) for row in rows])
+            km_arr = np.array([float(row['km_bilgisi']) if row.get('km_bilgisi') else 0
+                               for row in rows], dtype=np.float64)
+
+            unik_plakalar, plaka_idx = np.unique(plaka_arr, return_inverse=True)
+
+            farklar = np.diff(km_arr)
+            gecerli = (plaka_arr[1:] == plaka_arr[:-1]) & (farklar > 0) & (km_arr[1:] > 0) & (km_arr[:-1] > 0)
+
+            toplamlar = np.bincount(plaka_idx[1:][gecerli],
+                                    weights=farklar[gecerli],
+                                    minlength=len(unik_plakalar))
+
+            km_toplamlari = dict(zip(unik_plakalar.tolist(), toplamlar.tolist()))
+
+        if plakalar is not None:
+            return {str(p): km_toplamlari.get(str(p), 0) for p in plakalar}
+        return km_toplamlari
+    except Exception as e:
+        print(f"Error calculating bulk km: {e}")
+        return {str(p): 0 for p in plakalar} if plakalar else {}
+
+@_ttl_cached
 def get_database_info() -> Dict[str, Any]:
     """Veritabanı bilgilerini getir"""
     try:
@@ -180,6 +289,32 @@ def get_database_info() -> Dict[str, Any]:
     except Exception as e:
         return {'exists': False, 'error': str(e)}
 
+def get_performans_ozeti(plaka: str, baslangic_tarihi: str = None, bitis_tarihi: str = None):
+    """
+    Bir plakanın performans özetini veritabanında topla (RPC)
+
+    Toplamlar ve aylık dağılım GROUP BY ile Postgres'te hesaplanır;
+    ham satırlar ağ üzerinden taşınmaz.
+
+    Returns:
+        dict veya None (fonksiyon kurulmamışsa - çağıran REST yoluna düşer)
+    """
+    try:
+        sonuc = supabase_rpc('get_performans', {
+            'p_plaka': plaka, 'p_bas': baslangic_tarihi, 'p_bit': bitis_tarihi})
+        if sonuc:
+            satir = sonuc[0]
+            return {
+                'toplam_yakit': float(satir.get('toplam_yakit') or 0),
+                'toplam_maliyet': float(satir.get('toplam_maliyet') or 0),
+                'kayit_sayisi': int(satir.get('kayit_sayisi') or 0),
+                'aylik': satir.get('aylik') or {}
+            }
+    except Exception:
+        pass
+    return None
+
+@_ttl_cached
 def get_statistics() -> Dict[str, Any]:
     """İstatistikleri getir"""
     try:
@@ -187,8 +322,11 @@ def get_statistics() -> Dict[str, Any]:
         agirlik_data = fetch_all_paginated('agirlik', select='id')
         arac_takip_data = fetch_all_paginated('arac_takip', select='id')
 
-        toplam_yakit = sum(float(row.get('yakit_miktari', 0) or 0) for row in yakit_data)
-        toplam_maliyet = sum(float(row.get('satir_tutari', 0) or 0) for row in yakit_data)
+        # Satır başına float()/or yerine tek NumPy indirgemesi
+        toplam_yakit = float(np.fromiter((row.get('yakit_miktari') or 0 for row in yakit_data),
+                                         dtype=np.float64, count=len(yakit_data)).sum())
+        toplam_maliyet = float(np.fromiter((row.get('satir_tutari') or 0 for row in yakit_data),
+                                           dtype=np.float64, count=len(yakit_data)).sum())
         plakalar = list(set(row['plaka'] for row in yakit_data if row.get('plaka')))
 
         return {
@@ -214,6 +352,7 @@ def get_statistics() -> Dict[str, Any]:
             'toplam_kayit': 0
         }
 
+@_ttl_cached
 def get_aktif_kargo_araclari() -> List[str]:
     """Aktif kargo araçlarını getir"""
     try:
@@ -224,6 +363,7 @@ def get_aktif_kargo_araclari() -> List[str]:
     except:
         return []
 
+@_ttl_cached
 def get_aktif_binek_araclar(dahil_taseron: bool = False) -> List[str]:
     """Aktif binek araçları getir"""
     try:
@@ -236,6 +376,7 @@ def get_aktif_binek_araclar(dahil_taseron: bool = False) -> List[str]:
     except:
         return []
 
+@_ttl_cached
 def get_aktif_is_makineleri(dahil_taseron: bool = False) -> List[str]:
     """Aktif iş makinelerini getir"""
     try:
@@ -248,6 +389,7 @@ def get_aktif_is_makineleri(dahil_taseron: bool = False) -> List[str]:
     except:
         return []
 
+@_ttl_cached
 def get_all_plakas() -> List[str]:
     """Tüm plakaları getir"""
     try:
@@ -274,6 +416,7 @@ def add_arac(plaka: str, sahip: str, arac_tipi: str, notlar: str = '') -> Dict:
             'aktif': 1
         }
         supabase_request('araclar', method='POST', data=data)
+        clear_cache()
         return {'status': 'success'}
     except Exception as e:
         return {'status': 'error', 'message': str(e)}
@@ -288,6 +431,7 @@ def update_arac(plaka: str, sahip: str, arac_tipi: str, aktif: int, notlar: str
             'notlar': notlar
         }
         supabase_request(f'araclar?plaka=eq.{plaka}', method='PATCH', data=data)
+        clear_cache()
         return {'status': 'success'}
     except Exception as e:
         return {'status': 'error', 'message': str(e)}
@@ -296,6 +440,7 @@ def delete_arac(plaka: str) -> Dict:
     """Araç sil"""
     try:
         supabase_request(f'araclar?plaka=eq.{plaka}', method='DELETE')
+        clear_cache()
         return {'status': 'success'}
     except Exception as e:
         return {'status': 'error', 'message': str(e)}
@@ -313,6 +458,7 @@ def bulk_import_araclar() -> Dict:
                 add_arac(plaka, 'BİZİM', 'KARGO ARACI')
                 eklenen += 1
 
+        clear_cache()
         return {
             'status': 'success',
             'eklenen': eklenen,
@@ -321,6 +467,7 @@ def bulk_import_araclar() -> Dict:
     except Exception as e:
         return {'status': 'error', 'message': str(e)}
 
+@_ttl_cached
 def get_plakalar_by_type(arac_tipi: str = None) -> List[str]:
     """Araç tipine göre plakaları getir"""
     try:
@@ -347,6 +494,7 @@ def update_arac_bulk_sahip(plakalar: List[str], sahip: str) -> int:
             basarili += 1
         except:
             pass
+    clear_cache()
     return basarili
 
 def update_arac_bulk_aktif(plakalar: List[str], aktif: int) -> int:
@@ -358,6 +506,7 @@ def update_arac_bulk_aktif(plakalar: List[str], aktif: int) -> int:
             basarili += 1
         except:
             pass
+    clear_cache()
     return basarili
 
 def get_muhasebe_data(baslangic_tarihi: str = None, bitis_tarihi: str = None, plaka: str = None) -> Dict:
@@ -371,8 +520,6 @@ def get_muhasebe_data(baslangic_tarihi: str = None, bitis_tarihi: str = None, pl
         if plaka:
             agirlik_filters['plaka'] = f'eq.{plaka}'
 
-        agirlik_data = fetch_all_paginated('agirlik', filters=agirlik_filters)
-
         yakit_filters = {}
         if baslangic_tarihi:
             yakit_filters['islem_tarihi'] = f'gte.{baslangic_tarihi}'
@@ -381,7 +528,15 @@ def get_muhasebe_data(baslangic_tarihi: str = None, bitis_tarihi: str = None, pl
         if plaka:
             yakit_filters['plaka'] = f'eq.{plaka}'
 
-        yakit_data = fetch_all_paginated('yakit', filters=yakit_filters)
+        # Hesap için yalnızca plaka ve tutar kolonları gerekiyor - kolon
+        # bazlı seçim satır başına transfer edilen veriyi küçültür.
+        # İki tablo birbirinden bağımsız; istekler aynı anda gider
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            agirlik_future = ex.submit(fetch_all_paginated, 'agirlik',
+                                       'plaka,miktar', agirlik_filters)
+            yakit_data = fetch_all_paginated('yakit', select='plaka,satir_tutari',
+                                             filters=yakit_filters)
+            agirlik_data = agirlik_future.result()
 
         toplam_gelir = sum(float(row.get('miktar', 0) or 0) * 50 for row in agirlik_data)
         toplam_gider = sum(float(row.get('satir_tutari', 0) or 0) for row in yakit_data)
@@ -1,13 +1,81 @@
 import sqlite3
 import os
+import threading
+from functools import wraps
 from typing import List, Dict, Any
 
 DATABASE_PATH = 'kargo_data.db'
 
+# Bileşik indeksler bir kez kurulur; filtreli join'ler ve plaka+tarih
+# sorguları tam tablo taraması yerine sınırlı indeks taraması yapar
+_indexler_hazir = False
+
+def _ensure_indexes(conn):
+    """Sorgu desenlerine uyan bileşik indeksleri (yoksa) oluştur"""
+    global _indexler_hazir
+    if _indexler_hazir:
+        return
+    try:
+        # id son kolonda: ORDER BY islem_tarihi, id sıralı indeks
+        # yürüyüşü olur, geçici B-tree kurulmaz
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_yakit_plaka_tarih ON yakit(plaka, islem_tarihi, id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_agirlik_plaka_tarih ON agirlik(plaka, tarih)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_araclar_aktif_tip ON araclar(aktif, arac_tipi, sahip, plaka)')
+        conn.commit()
+        _indexler_hazir = True
+    except sqlite3.Error:
+        pass  # tablolar henüz oluşmamış olabilir
+
+# Her çağrıda open/close yapmak sayfa önbelleğini sürekli çöpe atıyordu;
+# thread başına tek kalıcı bağlantı tutulur, çağıranlar close etmez
+_local = threading.local()
+
 def get_db_connection():
-    """SQLite veritabanı bağlantısı oluştur"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
+    """Thread'e ait kalıcı SQLite bağlantısını döndür (yoksa aç)"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        # Plaka döngülerinde aynı SQL tekrar tekrar çalışır; geniş ifade
+        # önbelleği yeniden ayrıştırmayı (parse/plan) atlar
+        conn = sqlite3.connect(DATABASE_PATH, cached_statements=512)
+        conn.row_factory = sqlite3.Row
+        # WAL: okuyucular yazıcıyı beklemez; kalan pragmalar geçici alanı
+        # ve sayfa önbelleğini bellekte tutar
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-64000')
+        conn.execute('PRAGMA mmap_size=268435456')
+        # Eşzamanlı yazıcıyla çakışmada hemen hata yerine kısa bekleme
+        conn.execute('PRAGMA busy_timeout=5000')
+        _ensure_indexes(conn)
+        # Güncel istatistiklerle planlayıcı bileşik indeksleri tercih
+        # eder; analysis_limit taramayı sınırlar, optimize ucuz kalır
+        conn.execute('PRAGMA analysis_limit=400')
+        conn.execute('PRAGMA optimize')
+        _local.conn = conn
+    return conn
+
+def get_ro_connection():
+    """Thread'e ait salt-okunur SQLite bağlantısını döndür (yoksa aç)
+
+    WAL altında okuyucular tek yazıcıyla yarışmaz; analiz fonksiyonları
+    bu bağlantıyı kullanınca istekler birbirini sıraya sokmadan paralel
+    tarama yapar, query_only da yanlışlıkla yazmayı engeller.
+    """
+    conn = getattr(_local, 'ro_conn', None)
+    if conn is None:
+        try:
+            conn = sqlite3.connect(f'file:{DATABASE_PATH}?mode=ro', uri=True, cached_statements=512)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA query_only=1')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA cache_size=-64000')
+            conn.execute('PRAGMA mmap_size=268435456')
+            conn.execute('PRAGMA busy_timeout=5000')
+        except sqlite3.Error:
+            # Dosya henüz oluşmadıysa normal bağlantıya düş
+            return get_db_connection()
+        _local.ro_conn = conn
     return conn
 
 def dict_from_row(row):
@@ -16,6 +84,56 @@ def dict_from_row(row):
         return None
     return {key: row[key] for key in row.keys()}
 
+def dicts_from_cursor(cursor):
+    """Cursor'daki tüm satırları dict listesine çevir
+
+    Kolon adları cursor.description'dan bir kez alınır; satır başına
+    keys() çağrısı ve isim->indeks araması yapılmaz. Cursor üzerinde
+    doğrudan yürünür: fetchall'un ara Row listesi hiç kurulmaz, tepe
+    bellek kullanımı tek geçişe düşer.
+    """
+    kolonlar = [k[0] for k in cursor.description]
+    cursor.arraysize = 1000
+    return [dict(zip(kolonlar, row)) for row in cursor]
+
+# araclar tablosunun varlığı ve tablo listesi süreç ömrü boyunca
+# değişmez; sqlite_master sorguları ilk çağrıda bir kez yapılır
+_ARACLAR_EXISTS = None
+_TABLO_ADLARI = None
+
+def _araclar_exists(cursor):
+    """araclar tablosu var mı? (ilk çağrıda sorgulanır, sonra bellekten)"""
+    global _ARACLAR_EXISTS
+    if _ARACLAR_EXISTS is None:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='araclar'")
+        _ARACLAR_EXISTS = cursor.fetchone() is not None
+    return _ARACLAR_EXISTS
+
+# Pano sorguları (istatistik, plaka/araç listeleri) sadece araç yazma
+# işlemlerinde değişir; sonuçlar yazma olana kadar bellekte tutulur
+_CACHE_SURUMU = 0
+
+def _cache_bump():
+    """Araç yazma işlemlerinden sonra okuma önbelleklerini geçersiz kıl"""
+    global _CACHE_SURUMU
+    _CACHE_SURUMU += 1
+
+def _yazmaya_kadar_cached(func):
+    """Sonucu bir sonraki yazma işlemine (sürüm artışına) kadar önbellekle"""
+    durum = {'surum': -1, 'sonuclar': {}}
+
+    @wraps(func)
+    def sarici(*args, **kwargs):
+        if durum['surum'] != _CACHE_SURUMU:
+            durum['sonuclar'].clear()
+            durum['surum'] = _CACHE_SURUMU
+        anahtar = args + tuple(sorted(kwargs.items()))
+        if anahtar not in durum['sonuclar']:
+            durum['sonuclar'][anahtar] = func(*args, **kwargs)
+        return durum['sonuclar'][anahtar]
+
+    return sarici
+
 def hesapla_gercek_km(plaka, conn=None, baslangic_tarihi=None, bitis_tarihi=None):
     """
     Bir aracın gerçek gidilen kilometresini hesapla
@@ -35,68 +153,43 @@ def hesapla_gercek_km(plaka, conn=None, baslangic_tarihi=None, bitis_tarihi=None
     Returns:
         float: Toplam gidilen kilometre (ardışık farklar toplamı)
     """
-    close_conn = False
     if conn is None:
-        conn = get_db_connection()
-        close_conn = True
+        conn = get_ro_connection()
 
-    try:
-        cursor = conn.cursor()
+    cursor = conn.cursor()
 
-        # Tarih filtresi oluştur
-        tarih_filtresi = ""
-        params = [plaka]
+    # Tarih filtresi oluştur
+    tarih_filtresi = ""
+    params = [plaka]
 
-        if baslangic_tarihi and bitis_tarihi:
-            tarih_filtresi = "AND islem_tarihi BETWEEN ? AND ?"
-            params.extend([baslangic_tarihi, bitis_tarihi])
+    if baslangic_tarihi and bitis_tarihi:
+        tarih_filtresi = "AND islem_tarihi BETWEEN ? AND ?"
+        params.extend([baslangic_tarihi, bitis_tarihi])
 
-        # Tüm km kayıtlarını TARİH SIRASINA göre al (TARİH FİLTRELİ)
-        cursor.execute(f'''
-            SELECT km_bilgisi, islem_tarihi
+    # Ardışık farklar toplamı tamamen SQLite içinde hesaplanır:
+    # LAG ile önceki kayıt bulunur, sadece pozitif farklar toplanır
+    cursor.execute(f'''
+        SELECT COALESCE(SUM(CASE WHEN fark > 0 THEN fark ELSE 0 END), 0)
+        FROM (
+            SELECT CAST(km_bilgisi AS REAL)
+                   - LAG(CAST(km_bilgisi AS REAL)) OVER (ORDER BY islem_tarihi ASC, id ASC) AS fark
             FROM yakit
             WHERE plaka = ?
             AND km_bilgisi IS NOT NULL
             AND km_bilgisi > 0
             {tarih_filtresi}
-            ORDER BY islem_tarihi ASC, id ASC
-        ''', tuple(params))
-
-        rows = cursor.fetchall()
-
-        if len(rows) < 2:
-            return 0
-
-        # Ardışık kayıtlar arasındaki farkları topla
-        toplam_km = 0
-        onceki_km = None
-
-        for row in rows:
-            km = float(row['km_bilgisi'])
+        )
+    ''', tuple(params))
 
-            if onceki_km is not None:
-                fark = km - onceki_km
-
-                # Sadece pozitif farkları topla (km sayacı ileri gitmiş)
-                if fark > 0:
-                    toplam_km += fark
-
-            onceki_km = km
-
-        return toplam_km
-
-    finally:
-        if close_conn:
-            conn.close()
+    return cursor.fetchone()[0]
 
 def get_yakit_data():
     """Sadece aktif araçların yakıt verilerini çek"""
     try:
-        conn = get_db_connection()
+        conn = get_ro_connection()
         cursor = conn.cursor()
 
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='araclar'")
-        araclar_exists = cursor.fetchone() is not None
+        araclar_exists = _araclar_exists(cursor)
 
         if araclar_exists:
             cursor.execute('''
@@ -107,9 +200,7 @@ def get_yakit_data():
         else:
             cursor.execute('SELECT * FROM yakit')
 
-        rows = cursor.fetchall()
-        conn.close()
-        return [dict_from_row(row) for row in rows]
+        return dicts_from_cursor(cursor)
     except Exception as e:
         print(f"Yakıt verisi çekilemedi: {e}")
         return []
@@ -117,11 +208,10 @@ def get_yakit_data():
 def get_agirlik_data():
     """Sadece aktif araçların ağırlık (kantar) verilerini çek"""
     try:
-        conn = get_db_connection()
+        conn = get_ro_connection()
         cursor = conn.cursor()
 
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='araclar'")
-        araclar_exists = cursor.fetchone() is not None
+        araclar_exists = _araclar_exists(cursor)
 
         if araclar_exists:
             cursor.execute('''
@@ -132,9 +222,7 @@ def get_agirlik_data():
         else:
             cursor.execute('SELECT * FROM agirlik')
 
-        rows = cursor.fetchall()
-        conn.close()
-        return [dict_from_row(row) for row in rows]
+        return dicts_from_cursor(cursor)
     except Exception as e:
         print(f"Ağırlık verisi çekilemedi: {e}")
         return []
@@ -142,122 +230,195 @@ def get_agirlik_data():
 def get_arac_takip_data():
     """Araç takip verilerini çek"""
     try:
-        conn = get_db_connection()
+        conn = get_ro_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM arac_takip')
-        rows = cursor.fetchall()
-        conn.close()
-        return [dict_from_row(row) for row in rows]
+        return dicts_from_cursor(cursor)
     except Exception as e:
         print(f"Araç takip verisi çekilemedi: {e}")
         return []
 
+@_yazmaya_kadar_cached
 def get_all_plakas():
     """Aktif araçların plakalarını getir"""
     try:
-        conn = get_db_connection()
+        conn = get_ro_connection()
         cursor = conn.cursor()
 
-        all_plakalar = set()
-
-        cursor.execute('SELECT DISTINCT plaka FROM yakit WHERE plaka IS NOT NULL')
-        for row in cursor.fetchall():
-            all_plakalar.add(row['plaka'])
-
-        cursor.execute('SELECT DISTINCT plaka FROM agirlik WHERE plaka IS NOT NULL')
-        for row in cursor.fetchall():
-            all_plakalar.add(row['plaka'])
-
-        cursor.execute('SELECT DISTINCT plaka FROM arac_takip WHERE plaka IS NOT NULL')
-        for row in cursor.fetchall():
-            all_plakalar.add(row['plaka'])
-
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='araclar'")
-        araclar_exists = cursor.fetchone() is not None
+        araclar_exists = _araclar_exists(cursor)
 
+        aktif_var = False
         if araclar_exists:
-            cursor.execute('SELECT plaka FROM araclar WHERE aktif = 1')
-            aktif_plakalar = set([row['plaka'] for row in cursor.fetchall()])
+            cursor.execute('SELECT EXISTS(SELECT 1 FROM araclar WHERE aktif = 1)')
+            aktif_var = bool(cursor.fetchone()[0])
 
-            if aktif_plakalar:
-                all_plakalar = all_plakalar.intersection(aktif_plakalar)
+        # Üç ayrı DISTINCT sorgusu + Python küme birleşimi/kesişimi yerine
+        # tek UNION planı; tekilleştirme ve sıralama SQLite'ta yapılır
+        if aktif_var:
+            cursor.execute('''
+                SELECT u.plaka FROM (
+                    SELECT plaka FROM yakit
+                    UNION SELECT plaka FROM agirlik
+                    UNION SELECT plaka FROM arac_takip
+                ) u
+                INNER JOIN araclar a ON a.plaka = u.plaka AND a.aktif = 1
+                WHERE u.plaka IS NOT NULL
+                ORDER BY u.plaka
+            ''')
+        else:
+            cursor.execute('''
+                SELECT plaka FROM yakit WHERE plaka IS NOT NULL
+                UNION SELECT plaka FROM agirlik WHERE plaka IS NOT NULL
+                UNION SELECT plaka FROM arac_takip WHERE plaka IS NOT NULL
+                ORDER BY plaka
+            ''')
 
-        conn.close()
-        return sorted(list(all_plakalar))
+        return [row['plaka'] for row in cursor.fetchall()]
     except Exception as e:
         print(f"Plakalar getirilemedi: {e}")
         return []
 
-def get_yakit_by_plaka(plaka):
+def get_yakit_by_plaka(plaka, conn=None):
     """Belirli bir plakaya ait yakıt verilerini getir"""
     try:
-        conn = get_db_connection()
+        if conn is None:
+            conn = get_ro_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM yakit WHERE plaka = ?', (plaka,))
-        rows = cursor.fetchall()
-        conn.close()
-        return [dict_from_row(row) for row in rows]
+        return dicts_from_cursor(cursor)
     except Exception as e:
         print(f"Plaka bazlı yakıt verisi çekilemedi: {e}")
         return []
 
-def get_agirlik_by_plaka(plaka, sadece_urun=False):
+def get_agirlik_by_plaka(plaka, sadece_urun=False, conn=None):
     """Belirli bir plakaya ait ağırlık verilerini getir
 
     Args:
         plaka: Araç plakası
         sadece_urun: True ise sadece ürün kayıtlarını getir (Adet hariç)
+        conn: Veritabanı bağlantısı (opsiyonel)
     """
     try:
-        conn = get_db_connection()
+        if conn is None:
+            conn = get_ro_connection()
         cursor = conn.cursor()
 
         if sadece_urun:
             cursor.execute('''
                 SELECT * FROM agirlik
                 WHERE plaka = ?
-                AND birim NOT IN ('Adet', 'adet', 'ADET')
+                AND birim <> 'adet' COLLATE NOCASE
             ''', (plaka,))
         else:
             cursor.execute('SELECT * FROM agirlik WHERE plaka = ?', (plaka,))
 
-        rows = cursor.fetchall()
-        conn.close()
-        return [dict_from_row(row) for row in rows]
+        return dicts_from_cursor(cursor)
     except Exception as e:
         print(f"Plaka bazlı ağırlık verisi çekilemedi: {e}")
         return []
 
-def get_arac_takip_by_plaka(plaka):
+def get_arac_takip_by_plaka(plaka, conn=None):
     """Belirli bir plakaya ait araç takip verilerini getir"""
     try:
-        conn = get_db_connection()
+        if conn is None:
+            conn = get_ro_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM arac_takip WHERE plaka = ?', (plaka,))
-        rows = cursor.fetchall()
-        conn.close()
-        return [dict_from_row(row) for row in rows]
+        return dicts_from_cursor(cursor)
     except Exception as e:
         print(f"Plaka bazlı araç takip verisi çekilemedi: {e}")
         return []
 
-def get_statistics():
-    """Genel istatistikleri hesapla"""
+# Tablo başına json_object kolon listesi bir kez üretilir; JSON ikizleri
+# satırları dict'e açmadan SQLite'ın JSON1 eklentisiyle tek string döndürür
+_JSON_SECIMLER = {}
+
+def _json_secimi(cursor, tablo):
+    """Tablonun json_group_array(json_object(...)) seçim ifadesini getir"""
+    secim = _JSON_SECIMLER.get(tablo)
+    if secim is None:
+        cursor.execute(f'PRAGMA table_info("{tablo}")')
+        parcalar = ', '.join(f"'{row[1]}', \"{row[1]}\"" for row in cursor.fetchall())
+        secim = f'json_group_array(json_object({parcalar}))'
+        _JSON_SECIMLER[tablo] = secim
+    return secim
+
+def _tablo_json(tablo, kosul='', params=(), siralama=''):
+    """Bir tablonun satırlarını hazır JSON dizisi string'i olarak döndür
+
+    Flask tarafı bu string'i jsonify'a sokmadan doğrudan
+    Response(..., mimetype='application/json') ile dönebilir.
+    """
     try:
-        conn = get_db_connection()
+        conn = get_ro_connection()
         cursor = conn.cursor()
+        secim = _json_secimi(cursor, tablo)
+        cursor.execute(f'SELECT {secim} FROM (SELECT * FROM "{tablo}" {kosul} {siralama})', params)
+        return cursor.fetchone()[0]
+    except Exception as e:
+        print(f"{tablo} JSON getirilemedi: {e}")
+        return '[]'
 
-        cursor.execute('SELECT COUNT(*) as count FROM yakit')
-        yakit_count = cursor.fetchone()['count']
+def get_all_araclar_json():
+    """Tüm araçları tek JSON dizisi string'i olarak getir"""
+    return _tablo_json('araclar', siralama='ORDER BY plaka')
 
-        cursor.execute('SELECT COUNT(*) as count FROM agirlik WHERE birim NOT IN ("Adet", "adet", "ADET")')
-        agirlik_count = cursor.fetchone()['count']
+def get_yakit_by_plaka_json(plaka):
+    """Plakanın yakıt kayıtlarını tek JSON dizisi string'i olarak getir"""
+    return _tablo_json('yakit', 'WHERE plaka = ?', (plaka,))
 
-        cursor.execute('SELECT COUNT(*) as count FROM arac_takip')
-        arac_count = cursor.fetchone()['count']
+def get_agirlik_by_plaka_json(plaka, sadece_urun=False):
+    """Plakanın ağırlık kayıtlarını tek JSON dizisi string'i olarak getir"""
+    if sadece_urun:
+        return _tablo_json('agirlik', "WHERE plaka = ? AND birim <> 'adet' COLLATE NOCASE", (plaka,))
+    return _tablo_json('agirlik', 'WHERE plaka = ?', (plaka,))
 
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='araclar'")
-        araclar_exists = cursor.fetchone() is not None
+def get_arac_takip_by_plaka_json(plaka):
+    """Plakanın araç takip kayıtlarını tek JSON dizisi string'i olarak getir"""
+    return _tablo_json('arac_takip', 'WHERE plaka = ?', (plaka,))
+
+def get_all_by_plaka(plaka):
+    """Bir plakanın yakıt, ağırlık ve araç takip verilerini tek seferde getir
+
+    Üç ayrı fonksiyon çağrısı yerine aynı bağlantı üzerinde üç sorgu
+    çalıştırır; sayfa önbelleği paylaşıldığı için ayrı turlardan ucuzdur.
+
+    Returns:
+        dict: {'yakit': [...], 'agirlik': [...], 'arac_takip': [...]}
+    """
+    try:
+        conn = get_ro_connection()
+        cursor = conn.cursor()
+
+        sonuc = {}
+        for anahtar, tablo in (('yakit', 'yakit'), ('agirlik', 'agirlik'), ('arac_takip', 'arac_takip')):
+            cursor.execute(f'SELECT * FROM {tablo} WHERE plaka = ?', (plaka,))
+            sonuc[anahtar] = dicts_from_cursor(cursor)
+
+        return sonuc
+    except Exception as e:
+        print(f"Plaka bazlı toplu veri çekilemedi: {e}")
+        return {'yakit': [], 'agirlik': [], 'arac_takip': []}
+
+@_yazmaya_kadar_cached
+def get_statistics():
+    """Genel istatistikleri hesapla"""
+    try:
+        conn = get_ro_connection()
+        cursor = conn.cursor()
+        # Bu yol yalnızca toplamlar ve tek kolonlu listeler döndürür;
+        # Row sarmalayıcısı yerine düz demetler kullanılır
+        cursor.row_factory = None
+
+        # Üç ayrı COUNT turu yerine tek ifade - bir hazırlama, bir satır
+        cursor.execute('''
+            SELECT (SELECT COUNT(*) FROM yakit),
+                   (SELECT COUNT(*) FROM agirlik WHERE birim <> 'adet' COLLATE NOCASE),
+                   (SELECT COUNT(*) FROM arac_takip)
+        ''')
+        yakit_count, agirlik_count, arac_count = cursor.fetchone()
+
+        araclar_exists = _araclar_exists(cursor)
 
         toplam_yakit = 0.0
         toplam_maliyet = 0.0
@@ -265,8 +426,11 @@ def get_statistics():
         plakalar = []
 
         if araclar_exists:
+            # Satırları Python'a taşıyıp tek tek toplamak yerine SUM'ı
+            # SQLite yapar; CAST sayı olmayan değerleri 0 sayar
             cursor.execute('''
-                SELECT y.yakit_miktari, y.satir_tutari
+                SELECT COALESCE(SUM(CAST(y.yakit_miktari AS REAL)), 0) AS toplam_yakit,
+                       COALESCE(SUM(CAST(y.satir_tutari AS REAL)), 0) AS toplam_maliyet
                 FROM yakit y
                 INNER JOIN araclar a ON y.plaka = a.plaka
                 WHERE y.yakit_miktari IS NOT NULL
@@ -274,66 +438,29 @@ def get_statistics():
                 AND a.aktif = 1
                 AND a.arac_tipi = 'KARGO ARACI'
             ''')
-            yakit_data = cursor.fetchall()
-
-            for row in yakit_data:
-                try:
-                    yakit_val = row['yakit_miktari']
-                    if yakit_val is not None and str(yakit_val).strip() != '':
-                        toplam_yakit += float(yakit_val)
-                except (ValueError, TypeError):
-                    pass
-
-                try:
-                    tutar_val = row['satir_tutari']
-                    if tutar_val is not None and str(tutar_val).strip() != '':
-                        toplam_maliyet += float(tutar_val)
-                except (ValueError, TypeError):
-                    pass
-
-            cursor.execute('''
-                SELECT COUNT(DISTINCT plaka) as count
-                FROM araclar
-                WHERE aktif = 1 AND arac_tipi = 'KARGO ARACI'
-            ''')
-            plaka_sayisi = cursor.fetchone()['count']
+            toplam_yakit, toplam_maliyet = cursor.fetchone()
 
+            # Ayrı COUNT(DISTINCT) sorgusu gereksiz - sayı listeden çıkar
             cursor.execute('''
                 SELECT plaka FROM araclar
                 WHERE aktif = 1 AND arac_tipi = 'KARGO ARACI'
                 ORDER BY plaka
             ''')
-            plakalar = [row['plaka'] for row in cursor.fetchall()]
+            plakalar = [row[0] for row in cursor.fetchall()]
+            plaka_sayisi = len(plakalar)
         else:
             cursor.execute('''
-                SELECT yakit_miktari, satir_tutari
+                SELECT COALESCE(SUM(CAST(yakit_miktari AS REAL)), 0) AS toplam_yakit,
+                       COALESCE(SUM(CAST(satir_tutari AS REAL)), 0) AS toplam_maliyet
                 FROM yakit
                 WHERE yakit_miktari IS NOT NULL AND yakit_miktari > 0
             ''')
-            yakit_data = cursor.fetchall()
-
-            for row in yakit_data:
-                try:
-                    yakit_val = row['yakit_miktari']
-                    if yakit_val is not None and str(yakit_val).strip() != '':
-                        toplam_yakit += float(yakit_val)
-                except (ValueError, TypeError):
-                    pass
-
-                try:
-                    tutar_val = row['satir_tutari']
-                    if tutar_val is not None and str(tutar_val).strip() != '':
-                        toplam_maliyet += float(tutar_val)
-                except (ValueError, TypeError):
-                    pass
-
-            cursor.execute('SELECT COUNT(DISTINCT plaka) as count FROM yakit')
-            plaka_sayisi = cursor.fetchone()['count']
+            toplam_yakit, toplam_maliyet = cursor.fetchone()
 
             cursor.execute('SELECT DISTINCT plaka FROM yakit ORDER BY plaka')
-            plakalar = [row['plaka'] for row in cursor.fetchall()]
+            plakalar = [row[0] for row in cursor.fetchall()]
+            plaka_sayisi = len(plakalar)
 
-        conn.close()
 
         return {
             'toplam_kayit': yakit_count + agirlik_count + arac_count,
@@ -362,15 +489,14 @@ def check_database_exists():
     """Veritabanı dosyasının varlığını kontrol et"""
     return os.path.exists(DATABASE_PATH)
 
+@_yazmaya_kadar_cached
 def get_all_araclar():
     """Tüm araçları getir"""
     try:
-        conn = get_db_connection()
+        conn = get_ro_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM araclar ORDER BY plaka')
-        rows = cursor.fetchall()
-        conn.close()
-        return [dict_from_row(row) for row in rows]
+        return dicts_from_cursor(cursor)
     except Exception as e:
         print(f"Araçlar getirilemedi: {e}")
         return []
@@ -380,18 +506,48 @@ def add_arac(plaka, sahip, arac_tipi, notlar=''):
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
+        # OR IGNORE: çakışan plaka exception + rollback yolu yerine
+        # sessizce atlanır, sonuç rowcount'tan okunur
         cursor.execute('''
-            INSERT INTO araclar (plaka, sahip, arac_tipi, notlar, aktif)
+            INSERT OR IGNORE INTO araclar (plaka, sahip, arac_tipi, notlar, aktif)
             VALUES (?, ?, ?, ?, 1)
         ''', (plaka, sahip, arac_tipi, notlar))
         conn.commit()
-        conn.close()
+        if cursor.rowcount == 0:
+            return {'status': 'error', 'message': 'Bu plaka zaten kayıtlı!'}
+        _cache_bump()
         return {'status': 'success', 'message': 'Araç başarıyla eklendi'}
-    except sqlite3.IntegrityError:
-        return {'status': 'error', 'message': 'Bu plaka zaten kayıtlı!'}
     except Exception as e:
         return {'status': 'error', 'message': str(e)}
 
+def add_araclar_bulk(kayitlar):
+    """Birden fazla aracı tek transaction'da ekle
+
+    Tek tek add_arac çağırmak kayıt başına bir fsync öder; executemany
+    ile N kayıt tek commit'te işlenir.
+
+    Args:
+        kayitlar: (plaka, sahip, arac_tipi, notlar) dizisi
+
+    Returns:
+        dict: status ve eklenen kayıt sayısı
+    """
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        cursor.executemany('''
+            INSERT OR IGNORE INTO araclar (plaka, sahip, arac_tipi, notlar, aktif)
+            VALUES (?, ?, ?, ?, 1)
+        ''', kayitlar)
+        eklenen = cursor.rowcount
+        conn.commit()
+        _cache_bump()
+        return {'status': 'success', 'eklenen': eklenen, 'message': f'{eklenen} araç eklendi'}
+    except Exception as e:
+        conn.rollback()
+        return {'status': 'error', 'message': str(e)}
+
 def update_arac(plaka, sahip, arac_tipi, aktif, notlar=''):
     """Araç bilgilerini güncelle"""
     try:
@@ -404,7 +560,7 @@ def update_arac(plaka, sahip, arac_tipi, aktif, notlar=''):
             WHERE plaka = ?
         ''', (sahip, arac_tipi, aktif, notlar, plaka))
         conn.commit()
-        conn.close()
+        _cache_bump()
         return {'status': 'success', 'message': 'Araç güncellendi'}
     except Exception as e:
         return {'status': 'error', 'message': str(e)}
@@ -416,7 +572,7 @@ def delete_arac(plaka):
         cursor = conn.cursor()
         cursor.execute('DELETE FROM araclar WHERE plaka = ?', (plaka,))
         conn.commit()
-        conn.close()
+        _cache_bump()
         return {'status': 'success', 'message': 'Araç silindi'}
     except Exception as e:
         return {'status': 'error', 'message': str(e)}
@@ -427,6 +583,10 @@ def bulk_import_araclar():
         conn = get_db_connection()
         cursor = conn.cursor()
 
+        # Açık transaction: INSERT ve sayım tek WAL bloğunda işlenir,
+        # rowcount da transaction altında güvenilir raporlanır
+        cursor.execute('BEGIN IMMEDIATE')
+
         cursor.execute('''
             INSERT OR IGNORE INTO araclar (plaka, sahip, arac_tipi, notlar, aktif)
             SELECT DISTINCT plaka, 'BİZİM', 'KARGO ARACI', 'Otomatik eklendi', 1
@@ -434,13 +594,17 @@ def bulk_import_araclar():
             WHERE plaka IS NOT NULL AND plaka != ''
         ''')
 
-        eklenen = cursor.rowcount
-
-        cursor.execute('SELECT COUNT(*) FROM araclar')
-        toplam = cursor.fetchone()[0]
+        # changes() + COUNT tek ifadede - ayrı bir sayım turu kalmaz
+        cursor.execute('SELECT changes(), (SELECT COUNT(*) FROM araclar)')
+        eklenen, toplam = cursor.fetchone()
 
         conn.commit()
-        conn.close()
+        _cache_bump()
+
+        # Toplu ekleme sonrası istatistikleri tazele ki planlayıcı
+        # değişen veri dağılımına göre indeks seçsin
+        cursor.execute('ANALYZE araclar')
+        cursor.execute('ANALYZE yakit')
 
         return {
             'status': 'success',
@@ -451,95 +615,49 @@ def bulk_import_araclar():
     except Exception as e:
         return {'status': 'error', 'message': str(e)}
 
-def get_aktif_kargo_araclari(dahil_taseron=False):
-    """Sadece aktif kargo araçlarını getir
+@_yazmaya_kadar_cached
+def _get_aktif_by_tip(arac_tipi, dahil_taseron, tip_adi):
+    """Bir araç tipinin aktif plakalarını getir (yazmaya kadar önbellekli)
 
     Args:
+        arac_tipi: araclar.arac_tipi değeri
         dahil_taseron: True ise taşeron araçlar da dahil edilir
+        tip_adi: Hata mesajında kullanılacak tip adı
     """
     try:
-        conn = get_db_connection()
+        conn = get_ro_connection()
         cursor = conn.cursor()
 
         if dahil_taseron:
             cursor.execute('''
                 SELECT plaka FROM araclar
-                WHERE aktif = 1 AND arac_tipi = 'KARGO ARACI'
-            ''')
+                WHERE aktif = 1 AND arac_tipi = ?
+            ''', (arac_tipi,))
         else:
             cursor.execute('''
                 SELECT plaka FROM araclar
                 WHERE aktif = 1
-                AND arac_tipi = 'KARGO ARACI'
+                AND arac_tipi = ?
                 AND sahip = 'BİZİM'
-            ''')
+            ''', (arac_tipi,))
 
         rows = cursor.fetchall()
-        conn.close()
         return [row['plaka'] for row in rows]
     except Exception as e:
-        print(f"Aktif kargo araçları getirilemedi: {e}")
+        print(f"Aktif {tip_adi} getirilemedi: {e}")
         return []
 
-def get_aktif_binek_araclar(dahil_taseron=False):
-    """Sadece aktif binek araçları getir
-
-    Args:
-        dahil_taseron: True ise taşeron araçlar da dahil edilir
-    """
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        if dahil_taseron:
-            cursor.execute('''
-                SELECT plaka FROM araclar
-                WHERE aktif = 1 AND arac_tipi = 'BİNEK ARAÇ'
-            ''')
-        else:
-            cursor.execute('''
-                SELECT plaka FROM araclar
-                WHERE aktif = 1
-                AND arac_tipi = 'BİNEK ARAÇ'
-                AND sahip = 'BİZİM'
-            ''')
+def get_aktif_kargo_araclari(dahil_taseron=False):
+    """Sadece aktif kargo araçlarını getir"""
+    return _get_aktif_by_tip('KARGO ARACI', dahil_taseron, 'kargo araçları')
 
-        rows = cursor.fetchall()
-        conn.close()
-        return [row['plaka'] for row in rows]
-    except Exception as e:
-        print(f"Aktif binek araçları getirilemedi: {e}")
-        return []
+def get_aktif_binek_araclar(dahil_taseron=False):
+    """Sadece aktif binek araçları getir"""
+    return _get_aktif_by_tip('BİNEK ARAÇ', dahil_taseron, 'binek araçları')
 
 def get_aktif_is_makineleri(dahil_taseron=False):
-    """Sadece aktif iş makinelerini getir
-
-    Args:
-        dahil_taseron: True ise taşeron araçlar da dahil edilir
-    """
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        if dahil_taseron:
-            cursor.execute('''
-                SELECT plaka FROM araclar
-                WHERE aktif = 1 AND arac_tipi = 'İŞ MAKİNESİ'
-            ''')
-        else:
-            cursor.execute('''
-                SELECT plaka FROM araclar
-                WHERE aktif = 1
-                AND arac_tipi = 'İŞ MAKİNESİ'
-                AND sahip = 'BİZİM'
-            ''')
-
-        rows = cursor.fetchall()
-        conn.close()
-        return [row['plaka'] for row in rows]
-    except Exception as e:
-        print(f"Aktif iş makineleri getirilemedi: {e}")
-        return []
+    """Sadece aktif iş makinelerini getir"""
+    return _get_aktif_by_tip('İŞ MAKİNESİ', dahil_taseron, 'iş makineleri')
 
 def plaka_filtre_uygula():
     """Analizlerde kullanılacak plaka filtresini döndür
@@ -548,115 +666,96 @@ def plaka_filtre_uygula():
         tuple: (WHERE clause, parameters tuple)
     """
     try:
+        # Yer tutuculu IN listesi her bağlantıda (ro dahil) çalışır;
+        # plaka listesi zaten yazmaya kadar önbellekli olduğundan
+        # filtreyi kurmak sorgu gerektirmez
         aktif_plakalar = get_aktif_kargo_araclari()
         if not aktif_plakalar:
             return "", ()
 
         placeholders = ','.join('?' * len(aktif_plakalar))
-        where_clause = f"plaka IN ({placeholders})"
-        return where_clause, tuple(aktif_plakalar)
+        return f"plaka IN ({placeholders})", tuple(aktif_plakalar)
     except:
         return "", ()
 
+def _muhasebe_sql(tarihli, plakali):
+    """Muhasebe sorgusunun filtre kombinasyonuna göre SQL metnini üret"""
+    yakit_filtre = ""
+    agirlik_filtre = ""
+    if tarihli:
+        yakit_filtre += " AND y.islem_tarihi BETWEEN ? AND ?"
+        agirlik_filtre += " AND ag.tarih BETWEEN ? AND ?"
+    if plakali:
+        yakit_filtre += " AND y.plaka = ?"
+        agirlik_filtre += " AND ag.plaka = ?"
+    return f'''
+        WITH yakit_ozet AS (
+            SELECT y.plaka, SUM(y.satir_tutari) as toplam_gider
+            FROM yakit y
+            INNER JOIN araclar ar ON y.plaka = ar.plaka
+            WHERE ar.aktif = 1 AND ar.arac_tipi = 'KARGO ARACI'{yakit_filtre}
+            GROUP BY y.plaka
+        ),
+        agirlik_ozet AS (
+            SELECT ag.plaka, SUM(ag.net_agirlik * 0.5) as toplam_gelir, MAX(ag.ana_malzeme) as ana_malzeme
+            FROM agirlik ag
+            INNER JOIN araclar ar ON ag.plaka = ar.plaka
+            WHERE ag.birim <> 'adet' COLLATE NOCASE
+            AND ar.aktif = 1 AND ar.arac_tipi = 'KARGO ARACI'{agirlik_filtre}
+            GROUP BY ag.plaka
+        )
+        SELECT p.plaka,
+               COALESCE(a.toplam_gelir, 0) as gelir,
+               COALESCE(y.toplam_gider, 0) as gider,
+               COALESCE(a.ana_malzeme, 'Bilinmiyor') as ana_malzeme
+        FROM (SELECT plaka FROM yakit_ozet UNION SELECT plaka FROM agirlik_ozet) p
+        LEFT JOIN yakit_ozet y ON y.plaka = p.plaka
+        LEFT JOIN agirlik_ozet a ON a.plaka = p.plaka
+        ORDER BY COALESCE(a.toplam_gelir, 0) - COALESCE(y.toplam_gider, 0) DESC
+    '''
+
+# Dört filtre şekli de import sırasında bir kez üretilir; her çağrıda
+# f-string/replace ile SQL kurulmaz ve ifade önbelleği hep aynı metni görür
+_MUHASEBE_SQL = {(t, p): _muhasebe_sql(t, p) for t in (False, True) for p in (False, True)}
+
 def get_muhasebe_data(baslangic_tarihi, bitis_tarihi, plaka=None):
     """Muhasebe verilerini hesapla"""
     try:
-        conn = get_db_connection()
+        conn = get_ro_connection()
         cursor = conn.cursor()
 
-        # Tarih filtresi oluştur
-        if baslangic_tarihi and bitis_tarihi:
-            tarih_filtre_yakit = "WHERE islem_tarihi BETWEEN ? AND ?"
-            tarih_filtre_agirlik = "WHERE tarih BETWEEN ? AND ?"
-            tarih_params = (baslangic_tarihi, bitis_tarihi)
-        else:
-            tarih_filtre_yakit = ""
-            tarih_filtre_agirlik = ""
-            tarih_params = ()
+        # Tarih ve plaka filtreleri - SADECE AKTİF KARGO ARAÇLARI
+        tarihli = bool(baslangic_tarihi and bitis_tarihi)
+        plakali = plaka is not None and plaka != ''
 
-        # Plaka filtresi ekle - SADECE AKTİF KARGO ARAÇLARI
-        if plaka:
-            yakit_query = f'''
-                SELECT y.plaka, SUM(y.satir_tutari) as toplam_gider
-                FROM yakit y
-                INNER JOIN araclar a ON y.plaka = a.plaka
-                {tarih_filtre_yakit.replace('islem_tarihi', 'y.islem_tarihi')}
-                {"AND" if tarih_filtre_yakit else "WHERE"} y.plaka = ?
-                AND a.aktif = 1 AND a.arac_tipi = 'KARGO ARACI'
-                GROUP BY y.plaka
-            '''
-            agirlik_query = f'''
-                SELECT ag.plaka, SUM(ag.net_agirlik * 0.5) as toplam_gelir, MAX(ag.ana_malzeme) as ana_malzeme
-                FROM agirlik ag
-                INNER JOIN araclar a ON ag.plaka = a.plaka
-                {tarih_filtre_agirlik.replace('tarih', 'ag.tarih')}
-                {"AND" if tarih_filtre_agirlik else "WHERE"} ag.plaka = ?
-                AND ag.birim NOT IN ('Adet', 'adet', 'ADET')
-                AND a.aktif = 1 AND a.arac_tipi = 'KARGO ARACI'
-                GROUP BY ag.plaka
-            '''
-            cursor.execute(yakit_query, tarih_params + (plaka,))
-            yakit_rows = cursor.fetchall()
-            cursor.execute(agirlik_query, tarih_params + (plaka,))
-            agirlik_rows = cursor.fetchall()
-        else:
-            yakit_query = f'''
-                SELECT y.plaka, SUM(y.satir_tutari) as toplam_gider
-                FROM yakit y
-                INNER JOIN araclar a ON y.plaka = a.plaka
-                {tarih_filtre_yakit.replace('islem_tarihi', 'y.islem_tarihi')}
-                {"WHERE" if not tarih_filtre_yakit else "AND"} a.aktif = 1 AND a.arac_tipi = 'KARGO ARACI'
-                GROUP BY y.plaka
-            '''
-            agirlik_query = f'''
-                SELECT ag.plaka, SUM(ag.net_agirlik * 0.5) as toplam_gelir, MAX(ag.ana_malzeme) as ana_malzeme
-                FROM agirlik ag
-                INNER JOIN araclar a ON ag.plaka = a.plaka
-                {tarih_filtre_agirlik.replace('tarih', 'ag.tarih')}
-                {"WHERE" if not tarih_filtre_agirlik else "AND"} ag.birim NOT IN ('Adet', 'adet', 'ADET')
-                AND a.aktif = 1 AND a.arac_tipi = 'KARGO ARACI'
-                GROUP BY ag.plaka
-            '''
-            cursor.execute(yakit_query, tarih_params)
-            yakit_rows = cursor.fetchall()
-            cursor.execute(agirlik_query, tarih_params)
-            agirlik_rows = cursor.fetchall()
-
-        conn.close()
-
-        plaka_veriler = {}
-        for row in yakit_rows:
-            p = row['plaka']
-            if p not in plaka_veriler:
-                plaka_veriler[p] = {'gelir': 0, 'gider': 0, 'ana_malzeme': 'Bilinmiyor'}
-            plaka_veriler[p]['gider'] = float(row['toplam_gider'] or 0)
-
-        for row in agirlik_rows:
-            p = row['plaka']
-            if p not in plaka_veriler:
-                plaka_veriler[p] = {'gelir': 0, 'gider': 0, 'ana_malzeme': 'Bilinmiyor'}
-            plaka_veriler[p]['gelir'] = float(row['toplam_gelir'] or 0)
-            plaka_veriler[p]['ana_malzeme'] = row['ana_malzeme'] or 'Bilinmiyor'
-
-        toplam_gelir = sum(v['gelir'] for v in plaka_veriler.values())
-        toplam_gider = sum(v['gider'] for v in plaka_veriler.values())
-        net_kar = toplam_gelir - toplam_gider
-        kar_marji = (net_kar / toplam_gelir * 100) if toplam_gelir > 0 else 0
+        tarih_params = (baslangic_tarihi, bitis_tarihi) if tarihli else ()
+        plaka_params = (plaka,) if plakali else ()
+
+        # Parametre sırası sorgudaki yer tutucularla aynı: önce yakıt
+        # filtresi (tarih+plaka), sonra ağırlık filtresi (tarih+plaka)
+        cursor.execute(_MUHASEBE_SQL[(tarihli, plakali)],
+                       tarih_params + plaka_params + tarih_params + plaka_params)
 
         plaka_bazli = []
-        for p, v in plaka_veriler.items():
-            net = v['gelir'] - v['gider']
-            marji = (net / v['gelir'] * 100) if v['gelir'] > 0 else 0
+        toplam_gelir = 0.0
+        toplam_gider = 0.0
+        for row in cursor.fetchall():
+            gelir = float(row['gelir'])
+            gider = float(row['gider'])
+            net = gelir - gider
+            toplam_gelir += gelir
+            toplam_gider += gider
             plaka_bazli.append({
-                'plaka': p,
-                'gelir': v['gelir'],
-                'gider': v['gider'],
+                'plaka': row['plaka'],
+                'gelir': gelir,
+                'gider': gider,
                 'net_kar': net,
-                'kar_marji': marji,
-                'ana_malzeme': v['ana_malzeme']
+                'kar_marji': (net / gelir * 100) if gelir > 0 else 0,
+                'ana_malzeme': row['ana_malzeme'] or 'Bilinmiyor'
             })
 
-        plaka_bazli.sort(key=lambda x: x['net_kar'], reverse=True)
+        net_kar = toplam_gelir - toplam_gider
+        kar_marji = (net_kar / toplam_gelir * 100) if toplam_gelir > 0 else 0
 
         return {
             'status': 'success',
@@ -673,11 +772,14 @@ def get_muhasebe_data(baslangic_tarihi, bitis_tarihi, plaka=None):
             'message': str(e)
         }
 
-def get_arac_performans_analizi(plaka, baslangic_tarihi=None, bitis_tarihi=None):
+def get_arac_performans_analizi(plaka, baslangic_tarihi=None, bitis_tarihi=None, conn=None):
     """Araç performans analizi - yakıt/km oranı ve tonaj bilgisi"""
     try:
-        conn = get_db_connection()
+        if conn is None:
+            conn = get_ro_connection()
         cursor = conn.cursor()
+        # Sadece toplamlar okunur; demet satırlar Row'dan ucuzdur
+        cursor.row_factory = None
 
         # Tarih filtresi
         if baslangic_tarihi and bitis_tarihi:
@@ -689,49 +791,51 @@ def get_arac_performans_analizi(plaka, baslangic_tarihi=None, bitis_tarihi=None)
             tarih_filtre_agirlik = ""
             tarih_params = ()
 
-        # Yakıt ve KM bilgisi
+        # Yakıt ve KM bilgisi - AVG yerine SUM/COUNT: aynı satırlar
+        # üzerinde ikinci bir toplama geçişi yapılmaz, ortalamalar
+        # Python'da sabit maliyetli bölmeyle hesaplanır
+        # NULL birleştirme COALESCE ile SQL'de yapılır; tek satırlık
+        # sonuç isim araması yerine konumsal olarak açılır
         yakit_query = f'''
             SELECT
-                SUM(yakit_miktari) as toplam_yakit,
-                SUM(km_bilgisi) as toplam_km,
-                COUNT(*) as sefer_sayisi,
-                AVG(yakit_miktari) as ort_yakit_sefer,
-                AVG(birim_fiyat) as ort_birim_fiyat,
-                SUM(satir_tutari) as toplam_maliyet
+                COALESCE(SUM(yakit_miktari), 0.0),
+                COALESCE(SUM(km_bilgisi), 0.0),
+                COUNT(*),
+                COALESCE(SUM(birim_fiyat), 0.0),
+                COUNT(birim_fiyat),
+                COALESCE(SUM(satir_tutari), 0.0)
             FROM yakit
             WHERE plaka = ? {tarih_filtre_yakit}
             AND yakit_miktari IS NOT NULL AND yakit_miktari > 0
         '''
         cursor.execute(yakit_query, (plaka,) + tarih_params)
-        yakit_row = cursor.fetchone()
+        (toplam_yakit, toplam_km, sefer_sayisi,
+         toplam_birim_fiyat, birim_fiyat_sayisi, toplam_maliyet) = cursor.fetchone()
 
         # Tonaj bilgisi (ağırlık tablosundan) - SADECE ÜRÜN (Adet HARİÇ)
         agirlik_query = f'''
             SELECT
-                SUM(net_agirlik) as toplam_tonaj,
-                COUNT(*) as yuklenme_sayisi,
-                AVG(net_agirlik) as ort_tonaj_yuklenme
+                COALESCE(SUM(net_agirlik), 0.0),
+                COUNT(*)
             FROM agirlik
             WHERE plaka = ? {tarih_filtre_agirlik}
             AND net_agirlik IS NOT NULL AND net_agirlik > 0
-            AND birim NOT IN ('Adet', 'adet', 'ADET')
+            AND birim <> 'adet' COLLATE NOCASE
         '''
         cursor.execute(agirlik_query, (plaka,) + tarih_params)
-        agirlik_row = cursor.fetchone()
-
-        conn.close()
+        toplam_tonaj, yuklenme_sayisi = cursor.fetchone()
 
         # Hesaplamalar
-        toplam_yakit = float(yakit_row['toplam_yakit'] or 0)
-        toplam_km = float(yakit_row['toplam_km'] or 0)
-        sefer_sayisi = int(yakit_row['sefer_sayisi'] or 0)
-        toplam_maliyet = float(yakit_row['toplam_maliyet'] or 0)
-        ort_yakit_sefer = float(yakit_row['ort_yakit_sefer'] or 0)
-        ort_birim_fiyat = float(yakit_row['ort_birim_fiyat'] or 0)
+        toplam_yakit = float(toplam_yakit)
+        toplam_km = float(toplam_km)
+        toplam_maliyet = float(toplam_maliyet)
+        ort_yakit_sefer = (toplam_yakit / sefer_sayisi) if sefer_sayisi > 0 else 0
+        # AVG(birim_fiyat) NULL satırları saymıyordu; payda açıkça
+        # NULL olmayan kayıt sayısıdır
+        ort_birim_fiyat = (float(toplam_birim_fiyat) / birim_fiyat_sayisi) if birim_fiyat_sayisi > 0 else 0
 
-        toplam_tonaj = float(agirlik_row['toplam_tonaj'] or 0)
-        yuklenme_sayisi = int(agirlik_row['yuklenme_sayisi'] or 0)
-        ort_tonaj_yuklenme = float(agirlik_row['ort_tonaj_yuklenme'] or 0)
+        toplam_tonaj = float(toplam_tonaj)
+        ort_tonaj_yuklenme = (toplam_tonaj / yuklenme_sayisi) if yuklenme_sayisi > 0 else 0
 
         # Yakıt/KM oranı
         yakit_km_orani = (toplam_yakit / toplam_km) if toplam_km > 0 else 0
@@ -788,19 +892,25 @@ def get_database_info():
         }
 
     try:
-        conn = get_db_connection()
+        conn = get_ro_connection()
         cursor = conn.cursor()
 
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [row['name'] for row in cursor.fetchall()]
-
-        table_info = {}
-        for table in tables:
-            cursor.execute(f'SELECT COUNT(*) as count FROM {table}')
-            count = cursor.fetchone()['count']
-            table_info[table] = count
+        # Şema süreç ömründe değişmez; tablo listesi bir kez okunur.
+        # Sayımlar tek ifadede skaler alt sorgularla döner
+        global _TABLO_ADLARI
+        if _TABLO_ADLARI is None:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+            _TABLO_ADLARI = [row['name'] for row in cursor.fetchall()]
+
+        if _TABLO_ADLARI:
+            sayim_sql = 'SELECT ' + ', '.join(
+                f'(SELECT COUNT(*) FROM "{tablo}")' for tablo in _TABLO_ADLARI
+            )
+            cursor.execute(sayim_sql)
+            table_info = dict(zip(_TABLO_ADLARI, cursor.fetchone()))
+        else:
+            table_info = {}
 
-        conn.close()
 
         return {
             'exists': True,
@@ -0,0 +1,48 @@
+/*
+  # Gerçek KM Hesaplama Fonksiyonları
+
+  1. Yeni Fonksiyonlar
+    - `get_gercek_km(p_plaka, p_bas, p_bit)` - Tek plakanın gerçek km'si
+    - `get_gercek_km_bulk(p_plakalar, p_bas, p_bit)` - Plaka bazında gerçek km seti
+
+  2. Amaç
+    - Ardışık km farkları LAG() penceresi ile veritabanında toplanır
+    - Satırlar uygulamaya taşınmaz; plaka başına tek skaler döner
+*/
+
+CREATE OR REPLACE FUNCTION get_gercek_km(p_plaka text, p_bas date DEFAULT NULL, p_bit date DEFAULT NULL)
+RETURNS numeric
+LANGUAGE sql
+STABLE
+AS $$
+  WITH t AS (
+    SELECT km_bilgisi,
+           LAG(km_bilgisi) OVER (ORDER BY islem_tarihi, id) AS onceki_km
+    FROM yakit
+    WHERE plaka = p_plaka
+      AND km_bilgisi > 0
+      AND (p_bas IS NULL OR islem_tarihi >= p_bas)
+      AND (p_bit IS NULL OR islem_tarihi <= p_bit)
+  )
+  SELECT COALESCE(SUM(GREATEST(km_bilgisi - onceki_km, 0)), 0) FROM t;
+$$;
+
+CREATE OR REPLACE FUNCTION get_gercek_km_bulk(p_plakalar text[] DEFAULT NULL, p_bas date DEFAULT NULL, p_bit date DEFAULT NULL)
+RETURNS TABLE(plaka text, toplam_km numeric)
+LANGUAGE sql
+STABLE
+AS $$
+  WITH t AS (
+    SELECT yakit.plaka,
+           km_bilgisi,
+           LAG(km_bilgisi) OVER (PARTITION BY yakit.plaka ORDER BY islem_tarihi, id) AS onceki_km
+    FROM yakit
+    WHERE km_bilgisi > 0
+      AND (p_plakalar IS NULL OR yakit.plaka = ANY(p_plakalar))
+      AND (p_bas IS NULL OR islem_tarihi >= p_bas)
+      AND (p_bit IS NULL OR islem_tarihi <= p_bit)
+  )
+  SELECT t.plaka, COALESCE(SUM(GREATEST(km_bilgisi - onceki_km, 0)), 0) AS toplam_km
+  FROM t
+  GROUP BY t.plaka;
+$$;
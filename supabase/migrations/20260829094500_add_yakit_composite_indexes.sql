@@ -0,0 +1,21 @@
+/*
+  # Yakıt Tablosu Bileşik İndeksleri
+
+  1. Yeni İndeksler
+    - `idx_yakit_plaka_tarih` - plaka + islem_tarihi bileşik indeksi
+    - `idx_yakit_km_kapsayan` - km sorguları için kapsayan kısmi indeks
+
+  2. Amaç
+    - Analiz uçları hep plaka ile filtreleyip tarihe göre sıralıyor;
+      bileşik indeks tam tablo taramasını sınırlı aralık taramasına çevirir
+    - INCLUDE kolonları sayesinde km/yakıt toplamları tablodan okumadan
+      (Index Only Scan) hesaplanabilir
+*/
+
+CREATE INDEX IF NOT EXISTS idx_yakit_plaka_tarih
+  ON yakit (plaka, islem_tarihi);
+
+CREATE INDEX IF NOT EXISTS idx_yakit_km_kapsayan
+  ON yakit (plaka, islem_tarihi)
+  INCLUDE (km_bilgisi, yakit_miktari, satir_tutari)
+  WHERE km_bilgisi > 0;
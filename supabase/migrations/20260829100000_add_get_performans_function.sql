@@ -0,0 +1,39 @@
+/*
+  # Performans Özeti Fonksiyonu
+
+  1. Yeni Fonksiyonlar
+    - `get_performans(p_plaka, p_bas, p_bit)` - Toplam yakıt/maliyet,
+      kayıt sayısı ve aylık dağılımı tek çağrıda döndürür
+
+  2. Amaç
+    - Ham yakıt satırlarını uygulamaya taşımak yerine GROUP BY
+      veritabanında çalışır; ağdan satırlar değil birkaç skaler geçer
+*/
+
+CREATE OR REPLACE FUNCTION get_performans(p_plaka text, p_bas date DEFAULT NULL, p_bit date DEFAULT NULL)
+RETURNS TABLE(toplam_yakit numeric, toplam_maliyet numeric, kayit_sayisi bigint, aylik jsonb)
+LANGUAGE sql
+STABLE
+AS $$
+  WITH kayitlar AS (
+    SELECT COALESCE(yakit_miktari, 0) AS yakit,
+           COALESCE(satir_tutari, 0) AS maliyet,
+           to_char(islem_tarihi, 'YYYY-MM') AS ay
+    FROM yakit
+    WHERE plaka = p_plaka
+      AND (p_bas IS NULL OR islem_tarihi >= p_bas)
+      AND (p_bit IS NULL OR islem_tarihi <= p_bit)
+  ),
+  aylik_toplam AS (
+    SELECT ay, SUM(yakit) AS yakit, SUM(maliyet) AS maliyet
+    FROM kayitlar
+    WHERE ay IS NOT NULL
+    GROUP BY ay
+  )
+  SELECT COALESCE(SUM(yakit), 0),
+         COALESCE(SUM(maliyet), 0),
+         COUNT(*),
+         COALESCE((SELECT jsonb_object_agg(ay, jsonb_build_object('yakit', yakit, 'maliyet', maliyet))
+                   FROM aylik_toplam), '{}'::jsonb)
+  FROM kayitlar;
+$$;
@@ -0,0 +1,36 @@
+/*
+  # Tablo Temizleme (TRUNCATE) Fonksiyonları
+
+  1. Yeni Fonksiyonlar
+    - `truncate_yakit()` - yakit tablosunu boşaltır
+    - `truncate_agirlik()` - agirlik tablosunu boşaltır
+    - `truncate_arac_takip()` - arac_takip tablosunu boşaltır
+
+  2. Amaç
+    - PostgREST üzerinden satır satır DELETE yerine sabit süreli TRUNCATE
+    - Büyük tablolarda temizlik dakikalar yerine milisaniyeler sürer
+*/
+
+CREATE OR REPLACE FUNCTION truncate_yakit()
+RETURNS void
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+  TRUNCATE TABLE yakit RESTART IDENTITY;
+$$;
+
+CREATE OR REPLACE FUNCTION truncate_agirlik()
+RETURNS void
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+  TRUNCATE TABLE agirlik RESTART IDENTITY;
+$$;
+
+CREATE OR REPLACE FUNCTION truncate_arac_takip()
+RETURNS void
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+  TRUNCATE TABLE arac_takip RESTART IDENTITY;
+$$;
@@ -1,13 +1,51 @@
 """
 Excel dosyalarını Supabase'e yükle
 """
-import pandas as pd
-import urllib.request
+import argparse
+import gzip
+import openpyxl
 import json
+import sys
 import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 
-# .env dosyasını manuel oku
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+# Aynı anda açık tutulacak HTTP isteği sayısı
+MAX_ESZAMANLI_ISTEK = 8
+
+# Okuyucunun önden hazırlayabileceği batch sayısı (bellek sınırı)
+KUYRUK_KAPASITESI = 4
+
+def json_encode(data):
+    """Gövdeyi orjson ile bayt olarak serileştir (yoksa stdlib json'a düş)
+
+    orjson 1000 kayıtlık batch'lerde birkaç kat hızlıdır ve NumPy
+    skalerlerini doğrudan destekler.
+    """
+    if orjson is None:
+        return json.dumps(data).encode()
+    return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+
+# .env dosyasını manuel oku (tekrar çağrılırsa dosya yeniden okunmaz)
+@lru_cache(maxsize=1)
 def load_env():
     env_path = os.path.join(os.path.dirname(__file__), '.env')
     env_vars = {}
@@ -24,37 +62,253 @@ env = load_env()
 SUPABASE_URL = env.get('VITE_SUPABASE_URL')
 SUPABASE_KEY = env.get('VITE_SUPABASE_ANON_KEY')
 
-def supabase_insert_batch(table: str, data: list):
-    """Supabase'e toplu veri ekle"""
-    url = f'{SUPABASE_URL}/rest/v1/{table}'
+# Tek paylaşımlı HTTP oturumu: her batch'te yeni TLS el sıkışması yerine
+# havuzdaki bağlantılar yeniden kullanılır (database.py ile aynı desen)
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_connections=MAX_ESZAMANLI_ISTEK,
+                                       pool_maxsize=MAX_ESZAMANLI_ISTEK * 2))
+_session.headers.update({
+    'apikey': SUPABASE_KEY or '',
+    'Authorization': f'Bearer {SUPABASE_KEY}',
+    'Content-Type': 'application/json',
+    'Prefer': 'return=minimal'
+})
+_HTTP_TIMEOUT = 60  # saniye
+
+# Tablo şemaları: kolon adı -> tip ('metin', 'metin_kirp' veya 'sayi')
+YAKIT_KOLONLARI = {
+    'plaka': 'metin_kirp',
+    'islem_tarihi': 'metin',
+    'saat': 'metin',
+    'yakit_miktari': 'sayi',
+    'birim_fiyat': 'sayi',
+    'satir_tutari': 'sayi',
+    'stok_adi': 'metin',
+    'km_bilgisi': 'sayi'
+}
+
+AGIRLIK_KOLONLARI = {
+    'tarih': 'metin',
+    'miktar': 'sayi',
+    'birim': 'metin',
+    'net_agirlik': 'sayi',
+    'plaka': 'metin_kirp',
+    'adres': 'metin',
+    'islem_noktasi': 'metin',
+    'cari_adi': 'metin'
+}
+
+ARAC_TAKIP_KOLONLARI = {
+    'plaka': 'metin_kirp',
+    'sofor_adi': 'metin',
+    'arac_gruplari': 'metin',
+    'tarih': 'metin',
+    'hareket_baslangic_tarihi': 'metin',
+    'hareket_bitis_tarihi': 'metin',
+    'baslangic_adresi': 'metin',
+    'bitis_adresi': 'metin',
+    'toplam_kilometre': 'sayi',
+    'hareket_suresi': 'metin',
+    'rolanti_suresi': 'metin',
+    'park_suresi': 'metin',
+    'gunluk_yakit_tuketimi_l': 'sayi'
+}
+
+def _sayi(deger):
+    """Hücreyi float'a çevir (boş/NaN/bozuk değerler None olur)"""
+    if deger is None or (isinstance(deger, float) and deger != deger):
+        return None
+    try:
+        return float(deger)
+    except (TypeError, ValueError):
+        return None
+
+def _metin(deger):
+    if deger is None or (isinstance(deger, float) and deger != deger):
+        return None
+    return str(deger)
+
+def _metin_kirp(deger):
+    if deger is None or (isinstance(deger, float) and deger != deger):
+        return None
+    return str(deger).strip()
+
+# Tip adı -> dönüştürücü; satır döngüsünde tip karşılaştırması yapılmaz
+_DONUSTURUCULER = {'sayi': _sayi, 'metin': _metin, 'metin_kirp': _metin_kirp}
+
+def _satir_kaynagi(path):
+    """Ham satır akışını döndür: varsa calamine, yoksa read_only openpyxl
+
+    python-calamine (Rust) XML'i openpyxl'den kat kat hızlı çözer ve
+    .xlsx/.xlsb/.xls'i aynı arayüzle okur; kurulu değilse openpyxl'in
+    akış modu kullanılır.
+    """
+    if CalamineWorkbook is not None:
+        wb = CalamineWorkbook.from_path(path)
+        sayfa = wb.get_sheet_by_index(0)
+        return iter(sayfa.to_python(skip_empty_area=True)), None
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    return wb.active.iter_rows(values_only=True), wb
+
+def _baslik_indeksleri(satirlar, kolonlar):
+    """Başlık satırını çöz, şema kolonlarının indekslerini döndür
+
+    Şema uyuşmazlığını satır satır None üretmek yerine baştan yakalar:
+    eksik kolon varsa ValueError fırlatır.
+    """
+    try:
+        baslik = [str(h).strip().lower() if h is not None else '' for h in next(satirlar)]
+    except StopIteration:
+        raise ValueError("Dosya boş: başlık satırı yok")
+    indeksler = {kolon: baslik.index(kolon) for kolon in kolonlar if kolon in baslik}
+
+    eksikler = [kolon for kolon in kolonlar if kolon not in indeksler]
+    if eksikler:
+        raise ValueError(f"Eksik kolonlar: {', '.join(eksikler)}")
 
-    req = urllib.request.Request(url, method='POST')
-    req.add_header('apikey', SUPABASE_KEY)
-    req.add_header('Authorization', f'Bearer {SUPABASE_KEY}')
-    req.add_header('Content-Type', 'application/json')
-    req.add_header('Prefer', 'return=minimal')
+    return indeksler
 
-    req.data = json.dumps(data).encode()
+def baslik_dogrula(path, kolonlar):
+    """Dosyayı aç ve başlığı şemayla doğrula (eksik kolonda ValueError)
 
+    Yükleyiciler bunu tabloyu temizlemeden ÖNCE çağırır; şeması tutmayan
+    bir dosya mevcut veriye dokunulmadan reddedilir.
+    """
+    satirlar, wb = _satir_kaynagi(path)
     try:
-        with urllib.request.urlopen(req) as response:
-            return response.status == 201
-    except Exception as e:
-        print(f"❌ Hata: {e}")
-        return False
+        _baslik_indeksleri(satirlar, kolonlar)
+    finally:
+        if wb is not None:
+            wb.close()
+
+def iter_excel_rows(path, kolonlar):
+    """Excel satırlarını sayfayı belleğe almadan kayıt olarak üret
+
+    Satırlar akıştan tek tek çözülür; bellek kullanımı sayfa boyutundan
+    bağımsız kalır. İlk satır başlık kabul edilir, şemadaki kolonlar
+    başlığa göre eşlenir.
+    """
+    satirlar, wb = _satir_kaynagi(path)
+    try:
+        indeksler = _baslik_indeksleri(satirlar, kolonlar)
+
+        # Kolon -> (indeks, dönüştürücü) eşlemesi bir kez kurulur;
+        # satır döngüsü hücre başına tek fonksiyon çağrısına iner
+        alanlar = [(kolon, indeksler[kolon], _DONUSTURUCULER[tip])
+                   for kolon, tip in kolonlar.items()]
+        for satir in satirlar:
+            n = len(satir)
+            yield {
+                kolon: donustur(satir[i]) if i < n else None
+                for kolon, i, donustur in alanlar
+            }
+    finally:
+        if wb is not None:
+            wb.close()
 
-def delete_all_records(table: str):
-    """Tablodaki tüm kayıtları sil"""
-    url = f'{SUPABASE_URL}/rest/v1/{table}?id=not.is.null'
+def supabase_insert_batch(table: str, data: list, deneme: int = 3):
+    """Supabase'e toplu veri ekle (başarısızlıkta artan bekleme ile tekrar dener)"""
+    url = f'{SUPABASE_URL}/rest/v1/{table}'
+    duz_govde = json_encode(data)
+    # En hızlı seviyede gzip bile JSON gövdeyi ~5-10 kat küçültür;
+    # yavaş bağlantılarda ağ süresi sıkıştırma maliyetini fazlasıyla örter
+    gz_govde = gzip.compress(duz_govde, compresslevel=1)
+    sikistirilmis = True
+
+    for i in range(deneme):
+        try:
+            if sikistirilmis:
+                yanit = _session.post(url, data=gz_govde,
+                                      headers={'Content-Encoding': 'gzip'},
+                                      timeout=_HTTP_TIMEOUT)
+            else:
+                yanit = _session.post(url, data=duz_govde, timeout=_HTTP_TIMEOUT)
+            if yanit.status_code in (200, 201, 204):
+                return True
+            # Sunucu sıkıştırılmış gövdeyi kabul etmiyorsa (4xx) bekleme
+            # olmadan sıkıştırmasız gövdeyle devam et (delete_all_records'un
+            # RPC -> DELETE düşüşüyle aynı desen)
+            if sikistirilmis and 400 <= yanit.status_code < 500:
+                sikistirilmis = False
+                continue
+            raise RuntimeError(f'HTTP {yanit.status_code}: {yanit.text[:200]}')
+        except Exception as e:
+            if i + 1 < deneme:
+                time.sleep(0.5 * (2 ** i))
+            else:
+                print(f"❌ Hata: {e}")
+    return False
+
+def batchler(kaynak, n):
+    """Bir akışı n'lik listeler halinde üret (son parça eksik olabilir)"""
+    kaynak = iter(kaynak)
+    while batch := list(islice(kaynak, n)):
+        yield batch
+
+def upload_stream(table: str, excel_file, kolonlar, batch_size: int = 1000):
+    """Excel akışından 1000'erli batch'ler kesip eşzamanlı yükle
+
+    Okuyucu (üretici) dolan batch'leri sınırlı bir kuyruğa koyar,
+    tüketici thread'ler kuyruktan alıp POST eder. Kuyruk dolduğunda
+    okuyucu bekler; böylece ağ yavaşsa bile bellekte en fazla
+    KUYRUK_KAPASITESI + işlenmekte olan kadar batch bulunur. Dönüş
+    değeri başarıyla yüklenen kayıt sayısıdır.
+    """
+    kuyruk = queue.Queue(maxsize=KUYRUK_KAPASITESI)
+    sayac = {'basarili': 0}
+    kilit = threading.Lock()
+
+    def tuketici():
+        while True:
+            batch = kuyruk.get()
+            if batch is None:
+                break
+            if supabase_insert_batch(table, batch):
+                with kilit:
+                    sayac['basarili'] += len(batch)
+                    print(f"   ✅ {sayac['basarili']} kayıt yüklendi")
+            else:
+                print(f"   ❌ {len(batch)} kayıtlık batch yüklenemedi")
 
-    req = urllib.request.Request(url, method='DELETE')
-    req.add_header('apikey', SUPABASE_KEY)
-    req.add_header('Authorization', f'Bearer {SUPABASE_KEY}')
+    isciler = [threading.Thread(target=tuketici) for _ in range(MAX_ESZAMANLI_ISTEK)]
+    for isci in isciler:
+        isci.start()
 
     try:
-        with urllib.request.urlopen(req) as response:
+        for batch in batchler(iter_excel_rows(excel_file, kolonlar), batch_size):
+            kuyruk.put(batch)
+    finally:
+        # Her tüketiciye bitiş işareti gönder ve bekle
+        for _ in isciler:
+            kuyruk.put(None)
+        for isci in isciler:
+            isci.join()
+
+    return sayac['basarili']
+
+def delete_all_records(table: str):
+    """Tablodaki tüm kayıtları sil
+
+    Önce sabit süreli TRUNCATE RPC'si denenir (truncate_<tablo>
+    fonksiyonları migration ile tanımlı); RPC yoksa eski satır satır
+    DELETE yoluna düşülür.
+    """
+    try:
+        yanit = _session.post(f'{SUPABASE_URL}/rest/v1/rpc/truncate_{table}',
+                              timeout=_HTTP_TIMEOUT)
+        if yanit.status_code in (200, 204):
             print(f"✅ {table} tablosu temizlendi")
             return True
+    except Exception:
+        pass
+
+    url = f'{SUPABASE_URL}/rest/v1/{table}?id=not.is.null'
+
+    try:
+        yanit = _session.delete(url, timeout=_HTTP_TIMEOUT)
+        yanit.raise_for_status()
+        print(f"✅ {table} tablosu temizlendi")
+        return True
     except Exception as e:
         print(f"❌ Temizleme hatası: {e}")
         return False
@@ -64,40 +318,16 @@ def upload_yakit(excel_file):
     print(f"\n⛽ Yakıt dosyası yükleniyor: {excel_file}")
 
     try:
-        df = pd.read_excel(excel_file)
-        print(f"📊 {len(df)} satır okundu")
-
-        # Kolon isimlerini kontrol et ve düzelt
-        df.columns = df.columns.str.strip().str.lower()
+        # Önce şemayı doğrula: dosya bozuksa tabloya dokunulmaz
+        baslik_dogrula(excel_file, YAKIT_KOLONLARI)
 
         # Temizlik
         delete_all_records('yakit')
 
-        # Verileri hazırla
-        records = []
-        for _, row in df.iterrows():
-            record = {
-                'plaka': str(row.get('plaka', '')).strip() if pd.notna(row.get('plaka')) else None,
-                'islem_tarihi': str(row.get('islem_tarihi', '')) if pd.notna(row.get('islem_tarihi')) else None,
-                'saat': str(row.get('saat', '')) if pd.notna(row.get('saat')) else None,
-                'yakit_miktari': float(row.get('yakit_miktari', 0)) if pd.notna(row.get('yakit_miktari')) else None,
-                'birim_fiyat': float(row.get('birim_fiyat', 0)) if pd.notna(row.get('birim_fiyat')) else None,
-                'satir_tutari': float(row.get('satir_tutari', 0)) if pd.notna(row.get('satir_tutari')) else None,
-                'stok_adi': str(row.get('stok_adi', '')) if pd.notna(row.get('stok_adi')) else None,
-                'km_bilgisi': float(row.get('km_bilgisi', 0)) if pd.notna(row.get('km_bilgisi')) else None
-            }
-            records.append(record)
-
-        # Batch olarak yükle (1000'er 1000'er)
-        batch_size = 1000
-        for i in range(0, len(records), batch_size):
-            batch = records[i:i+batch_size]
-            if supabase_insert_batch('yakit', batch):
-                print(f"   ✅ {i+len(batch)}/{len(records)} kayıt yüklendi")
-            else:
-                print(f"   ❌ {i}-{i+batch_size} arası yükleme başarısız")
+        # Akış halinde oku ve batch'ler halinde yükle
+        toplam = upload_stream('yakit', excel_file, YAKIT_KOLONLARI)
 
-        print(f"✅ Yakıt verileri yüklendi: {len(records)} kayıt")
+        print(f"✅ Yakıt verileri yüklendi: {toplam} kayıt")
         return True
 
     except Exception as e:
@@ -111,40 +341,16 @@ def upload_agirlik(excel_file):
     print(f"\n⚖️  Ağırlık dosyası yükleniyor: {excel_file}")
 
     try:
-        df = pd.read_excel(excel_file)
-        print(f"📊 {len(df)} satır okundu")
-
-        # Kolon isimlerini kontrol et ve düzelt
-        df.columns = df.columns.str.strip().str.lower()
+        # Önce şemayı doğrula: dosya bozuksa tabloya dokunulmaz
+        baslik_dogrula(excel_file, AGIRLIK_KOLONLARI)
 
         # Temizlik
         delete_all_records('agirlik')
 
-        # Verileri hazırla
-        records = []
-        for _, row in df.iterrows():
-            record = {
-                'tarih': str(row.get('tarih', '')) if pd.notna(row.get('tarih')) else None,
-                'miktar': float(row.get('miktar', 0)) if pd.notna(row.get('miktar')) else None,
-                'birim': str(row.get('birim', '')) if pd.notna(row.get('birim')) else None,
-                'net_agirlik': float(row.get('net_agirlik', 0)) if pd.notna(row.get('net_agirlik')) else None,
-                'plaka': str(row.get('plaka', '')).strip() if pd.notna(row.get('plaka')) else None,
-                'adres': str(row.get('adres', '')) if pd.notna(row.get('adres')) else None,
-                'islem_noktasi': str(row.get('islem_noktasi', '')) if pd.notna(row.get('islem_noktasi')) else None,
-                'cari_adi': str(row.get('cari_adi', '')) if pd.notna(row.get('cari_adi')) else None
-            }
-            records.append(record)
-
-        # Batch olarak yükle
-        batch_size = 1000
-        for i in range(0, len(records), batch_size):
-            batch = records[i:i+batch_size]
-            if supabase_insert_batch('agirlik', batch):
-                print(f"   ✅ {i+len(batch)}/{len(records)} kayıt yüklendi")
-            else:
-                print(f"   ❌ {i}-{i+batch_size} arası yükleme başarısız")
+        # Akış halinde oku ve batch'ler halinde yükle
+        toplam = upload_stream('agirlik', excel_file, AGIRLIK_KOLONLARI)
 
-        print(f"✅ Ağırlık verileri yüklendi: {len(records)} kayıt")
+        print(f"✅ Ağırlık verileri yüklendi: {toplam} kayıt")
         return True
 
     except Exception as e:
@@ -158,45 +364,16 @@ def upload_arac_takip(excel_file):
     print(f"\n🚛 Araç takip dosyası yükleniyor: {excel_file}")
 
     try:
-        df = pd.read_excel(excel_file)
-        print(f"📊 {len(df)} satır okundu")
-
-        # Kolon isimlerini kontrol et ve düzelt
-        df.columns = df.columns.str.strip().str.lower()
+        # Önce şemayı doğrula: dosya bozuksa tabloya dokunulmaz
+        baslik_dogrula(excel_file, ARAC_TAKIP_KOLONLARI)
 
         # Temizlik
         delete_all_records('arac_takip')
 
-        # Verileri hazırla
-        records = []
-        for _, row in df.iterrows():
-            record = {
-                'plaka': str(row.get('plaka', '')).strip() if pd.notna(row.get('plaka')) else None,
-                'sofor_adi': str(row.get('sofor_adi', '')) if pd.notna(row.get('sofor_adi')) else None,
-                'arac_gruplari': str(row.get('arac_gruplari', '')) if pd.notna(row.get('arac_gruplari')) else None,
-                'tarih': str(row.get('tarih', '')) if pd.notna(row.get('tarih')) else None,
-                'hareket_baslangic_tarihi': str(row.get('hareket_baslangic_tarihi', '')) if pd.notna(row.get('hareket_baslangic_tarihi')) else None,
-                'hareket_bitis_tarihi': str(row.get('hareket_bitis_tarihi', '')) if pd.notna(row.get('hareket_bitis_tarihi')) else None,
-                'baslangic_adresi': str(row.get('baslangic_adresi', '')) if pd.notna(row.get('baslangic_adresi')) else None,
-                'bitis_adresi': str(row.get('bitis_adresi', '')) if pd.notna(row.get('bitis_adresi')) else None,
-                'toplam_kilometre': float(row.get('toplam_kilometre', 0)) if pd.notna(row.get('toplam_kilometre')) else None,
-                'hareket_suresi': str(row.get('hareket_suresi', '')) if pd.notna(row.get('hareket_suresi')) else None,
-                'rolanti_suresi': str(row.get('rolanti_suresi', '')) if pd.notna(row.get('rolanti_suresi')) else None,
-                'park_suresi': str(row.get('park_suresi', '')) if pd.notna(row.get('park_suresi')) else None,
-                'gunluk_yakit_tuketimi_l': float(row.get('gunluk_yakit_tuketimi_l', 0)) if pd.notna(row.get('gunluk_yakit_tuketimi_l')) else None
-            }
-            records.append(record)
-
-        # Batch olarak yükle
-        batch_size = 1000
-        for i in range(0, len(records), batch_size):
-            batch = records[i:i+batch_size]
-            if supabase_insert_batch('arac_takip', batch):
-                print(f"   ✅ {i+len(batch)}/{len(records)} kayıt yüklendi")
-            else:
-                print(f"   ❌ {i}-{i+batch_size} arası yükleme başarısız")
+        # Akış halinde oku ve batch'ler halinde yükle
+        toplam = upload_stream('arac_takip', excel_file, ARAC_TAKIP_KOLONLARI)
 
-        print(f"✅ Araç takip verileri yüklendi: {len(records)} kayıt")
+        print(f"✅ Araç takip verileri yüklendi: {toplam} kayıt")
         return True
 
     except Exception as e:
@@ -206,48 +383,55 @@ def upload_arac_takip(excel_file):
         return False
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Excel dosyalarını Supabase'e yükle")
+    parser.add_argument('--yakit', help='Yakıt Excel dosyası')
+    parser.add_argument('--agirlik', help='Ağırlık Excel dosyası')
+    parser.add_argument('--arac-takip', dest='arac_takip', help='Araç takip Excel dosyası')
+    args = parser.parse_args()
+
     print("="*60)
     print("📤 EXCEL DOSYALARINI SUPABASE'E YÜKLE")
     print("="*60)
-    print("\n📝 Kullanım:")
-    print("1. Excel dosyalarınızı bu klasöre koyun")
-    print("2. Dosya isimlerini girin:")
-    print("\nÖrnek:")
-    print("   python3 upload_excel_to_supabase.py")
-    print("="*60)
 
-    # Kullanıcıdan dosya isimleri al
-    yakit_file = input("\n⛽ Yakıt Excel dosyası adı (boş bırakırsanız atlanır): ").strip()
-    agirlik_file = input("⚖️  Ağırlık Excel dosyası adı (boş bırakırsanız atlanır): ").strip()
-    arac_takip_file = input("🚛 Araç takip Excel dosyası adı (boş bırakırsanız atlanır): ").strip()
+    yakit_file = (args.yakit or '').strip()
+    agirlik_file = (args.agirlik or '').strip()
+    arac_takip_file = (args.arac_takip or '').strip()
+
+    # Argüman verilmediyse ve terminaldeyse eski etkileşimli akışa düş
+    if not (yakit_file or agirlik_file or arac_takip_file) and sys.stdin.isatty():
+        print("\n📝 Kullanım:")
+        print("1. Excel dosyalarınızı bu klasöre koyun")
+        print("2. Dosya isimlerini girin:")
+        print("\nÖrnek:")
+        print("   python3 upload_excel_to_supabase.py --yakit yakit.xlsx")
+        print("="*60)
+
+        # Kullanıcıdan dosya isimleri al
+        yakit_file = input("\n⛽ Yakıt Excel dosyası adı (boş bırakırsanız atlanır): ").strip()
+        agirlik_file = input("⚖️  Ağırlık Excel dosyası adı (boş bırakırsanız atlanır): ").strip()
+        arac_takip_file = input("🚛 Araç takip Excel dosyası adı (boş bırakırsanız atlanır): ").strip()
 
     print("\n" + "="*60)
     print("🚀 YÜKLEME BAŞLIYOR...")
     print("="*60)
 
+    # Üç tablo birbirinden bağımsız; yüklemeler paralel koşar,
+    # her görev kendi içinde temizlik -> ekleme sırasını korur
+    gorevler = []
+    for fonksiyon, dosya in ((upload_yakit, yakit_file),
+                             (upload_agirlik, agirlik_file),
+                             (upload_arac_takip, arac_takip_file)):
+        if dosya and os.path.exists(dosya):
+            gorevler.append((fonksiyon, dosya))
+        elif dosya:
+            print(f"\n❌ Dosya bulunamadı: {dosya}")
+
     success_count = 0
-    total_count = 0
-
-    if yakit_file and os.path.exists(yakit_file):
-        total_count += 1
-        if upload_yakit(yakit_file):
-            success_count += 1
-    elif yakit_file:
-        print(f"\n❌ Dosya bulunamadı: {yakit_file}")
-
-    if agirlik_file and os.path.exists(agirlik_file):
-        total_count += 1
-        if upload_agirlik(agirlik_file):
-            success_count += 1
-    elif agirlik_file:
-        print(f"\n❌ Dosya bulunamadı: {agirlik_file}")
-
-    if arac_takip_file and os.path.exists(arac_takip_file):
-        total_count += 1
-        if upload_arac_takip(arac_takip_file):
-            success_count += 1
-    elif arac_takip_file:
-        print(f"\n❌ Dosya bulunamadı: {arac_takip_file}")
+    total_count = len(gorevler)
+    if gorevler:
+        with ThreadPoolExecutor(max_workers=len(gorevler)) as havuz:
+            sonuclar = [havuz.submit(fonksiyon, dosya) for fonksiyon, dosya in gorevler]
+            success_count = sum(1 for sonuc in sonuclar if sonuc.result())
 
     print("\n" + "="*60)
     print(f"✅ TAMAMLANDI: {success_count}/{total_count} dosya başarıyla yüklendi")